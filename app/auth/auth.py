@@ -1,14 +1,16 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.users import User
-from app.config.database import get_db
+from app.config.database import get_async_db
 from fastapi import Depends, HTTPException, status
 from typing import List
 from app.permissions.base import ModelPermission
 from app.permissions.roles import get_role_permissions
 from app.data.data_class import settings
 from app.auth.auth_bearer import JWTBearer
+from app.auth.principals import Principal, principals
 import time
 import random
 from datetime import timedelta
@@ -43,18 +45,23 @@ def decodeJWT(token: str = Depends(JWTBearer())) -> dict:
         return {}
 
 # Function to retrieve a user by email from the database
-def get_user_by_email(db: Session, user_email: str):
-    user = db.query(User).filter(User.email == user_email).first()
+async def get_user_by_email(db: AsyncSession, user_email: str):
+    user = await db.scalar(select(User).filter(User.email == user_email))
     return user
 
-# Function to get the current user using a JWT token
-def get_current_user(token: str = Depends(JWTBearer()), db: Session = Depends(get_db)) -> User:
-    decoded_token = decodeJWT(token)
-    user_email = decoded_token.get('data')  # Extract the email from the decoded token
-    user = get_user_by_email(db, user_email)
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user credentials")
-    return user
+# Function to get the current user from the claims decoded by JWTBearer,
+# served from the principal cache and read from the database on a miss
+async def get_current_user(claims: dict = Depends(jwt_bearer), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    user_email = claims.get('data')  # Extract the email from the decoded token
+    principal = principals.get(user_email)
+    if principal is None:
+        generation = principals.generation
+        user = await get_user_by_email(db, user_email)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user credentials")
+        principal = Principal.model_validate(user)
+        principals.put(principal, generation)
+    return principal
 
 # Function to generate a otp for forgot password
 def generate_6_digit_otp():
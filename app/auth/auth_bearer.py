@@ -16,13 +16,13 @@ class JWTBearer(HTTPBearer):
 
     async def __call__(self, request: Request):
         """
-        Validates and extracts JWT from the request's Authorization header.
+        Validates and decodes the JWT from the request's Authorization header.
 
         Parameters:
         - request (Request): The incoming FastAPI request.
 
         Returns:
-        - str: The JWT token if valid.
+        - dict: The decoded claims, passed on so the token is decoded once per request.
 
         Raises:
         - HTTPException: If authentication fails.
@@ -31,27 +31,24 @@ class JWTBearer(HTTPBearer):
         if credentials:
             if not credentials.scheme == "Bearer":
                 raise HTTPException(status_code=403, detail="Invalid authentication scheme.")
-            if not self.verify_jwt(credentials.credentials):
+            payload = self.decode_jwt(credentials.credentials)
+            if not payload:
                 raise HTTPException(status_code=403, detail="Invalid token or expired token.")
-            return credentials.credentials
+            return payload
         else:
             raise HTTPException(status_code=403, detail="Invalid authorization code.")
 
-    def verify_jwt(self, jwtoken: str) -> bool:
+    def decode_jwt(self, jwtoken: str) -> dict:
         """
-        Verifies the validity of a JWT.
+        Decodes a JWT.
 
         Parameters:
         - jwtoken (str): The JWT token.
 
         Returns:
-        - bool: True if the token is valid, False otherwise.
+        - dict: The claims if the token is valid, an empty dict otherwise.
         """
-        isTokenValid: bool = False
         try:
-            payload = auth.decodeJWT(jwtoken)
+            return auth.decodeJWT(jwtoken)
         except:
-            payload = None
-        if payload:
-            isTokenValid = True
-        return isTokenValid
\ No newline at end of file
+            return {}
\ No newline at end of file
@@ -0,0 +1,77 @@
+# app/auth/hashing.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.data.data_class import settings
+from utils import verify_password, get_password_hash
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool, off the event loop.
+
+    bcrypt releases the GIL while it computes, so the threads use several cores and
+    the event loop keeps serving other requests meanwhile. Callers beyond the pool
+    size wait in the executor queue, its depth is reported by stats().
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Calls submitted and not finished, running or queued
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, function, *args):
+        # Started lazily for scripts running without the application lifespan
+        self.start()
+        submitted_at = time.perf_counter()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            started_at, result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed, function, *args
+            )
+        finally:
+            self.in_flight -= 1
+        waited = started_at - submitted_at
+        self.completed += 1
+        self.queue_seconds += waited
+        self.max_queue_seconds = max(self.max_queue_seconds, waited)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "max_in_flight": self.max_in_flight,
+            "completed": self.completed,
+            "avg_queue_ms": round(self.queue_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            "max_queue_ms": round(self.max_queue_seconds * 1000, 3),
+        }
+
+# Runs in the pool: when the call left the queue, and its result
+def _timed(function, *args):
+    return time.perf_counter(), function(*args)
+
+# Password hasher shared by the requests of this worker
+hasher = PasswordHasher(settings.password_hash_workers)
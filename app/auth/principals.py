@@ -0,0 +1,61 @@
+# app/auth/principals.py
+
+import time
+from collections import OrderedDict
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from app.data.data_class import settings
+
+class Principal(BaseModel):
+    """
+    Immutable snapshot of the authenticated user, read from a User row.
+    Holds what the permission checks and services read, never the password hash.
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    email: str
+    name: Optional[str] = None
+    role_id: int
+
+class PrincipalCache:
+    """
+    In-process LRU of the authenticated principals by email, with a TTL per entry.
+
+    The user services invalidate an email after committing a change to it. Other
+    workers keep serving their entry until it expires, so the TTL bounds how long a
+    role change or deletion takes to reach every worker.
+    """
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # Bumped by every invalidation, a load started before one is not stored
+        self.generation = 0
+
+    def get(self, email: str) -> Optional[Principal]:
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[email]
+            return None
+        self._entries.move_to_end(email)
+        return principal
+
+    def put(self, principal: Principal, generation: int):
+        if generation != self.generation or self.ttl <= 0:
+            return
+        self._entries[principal.email] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(principal.email)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *emails: str):
+        self.generation += 1
+        for email in emails:
+            self._entries.pop(email, None)
+
+# Principal cache shared by the requests of this worker
+principals = PrincipalCache(settings.principal_cache_max_entries, settings.principal_cache_ttl_seconds)
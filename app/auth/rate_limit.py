@@ -0,0 +1,105 @@
+# app/auth/rate_limit.py
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from app.config.database import msg
+from app.data.data_class import settings
+
+class RateLimitBackend(ABC):
+    """
+    Store of the rate limiter buckets. The in-process one limits each worker on its
+    own; a shared store (e.g. Redis with an atomic script) implementing hit makes the
+    limits hold across workers.
+    """
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        """Take one request from the bucket of key, return 0 or the seconds until one is available."""
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process token buckets: limit requests in a burst, refilled at limit per window.
+    Past max_keys the least recently used buckets are dropped.
+    """
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        now = time.monotonic()
+        rate = limit / window
+        tokens, updated_at = self._buckets.get(key, (limit, now))
+        tokens = min(limit, tokens + (now - updated_at) * rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+class RateLimiter:
+    """
+    Admission control of the endpoints that are cheap to call and expensive to serve.
+    Called first in the endpoint, before any password hashing or database work.
+    """
+    def __init__(self, backend: RateLimitBackend, window: int, enabled: bool = True):
+        self.backend = backend
+        self.window = window
+        self.enabled = enabled
+        self.rejected = 0
+
+    async def check(self, *rules: tuple):
+        """
+        Take one request from each (key, limit) bucket in order.
+
+        Stops at the first exhausted bucket, so requests rejected on the client address
+        do not drain the bucket of the account they target.
+
+        Raises:
+        - HTTPException: 429 with a Retry-After header.
+        """
+        if not self.enabled:
+            return
+        for key, limit in rules:
+            retry_after = await self.backend.hit(key, limit, self.window)
+            if retry_after:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=msg["too_many_requests"],
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+# Rate limiter shared by the requests of this worker
+rate_limiter = RateLimiter(
+    MemoryRateLimitBackend(settings.rate_limit_max_keys),
+    settings.rate_limit_window_seconds,
+    settings.rate_limit_enabled,
+)
+
+# Client address, as rewritten by uvicorn --proxy-headers behind a trusted proxy
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+# Limits of /user/login, by client address and by account
+async def limit_login(request: Request, email: str):
+    await rate_limiter.check(
+        (f"login:ip:{client_ip(request)}", settings.login_ip_limit),
+        (f"login:email:{email.lower()}", settings.login_email_limit),
+    )
+
+# Limits of /forgot_password, by client address and by account
+async def limit_forgot_password(request: Request, email: str):
+    await rate_limiter.check(
+        (f"forgot_password:ip:{client_ip(request)}", settings.forgot_password_ip_limit),
+        (f"forgot_password:email:{email.lower()}", settings.forgot_password_email_limit),
+    )
@@ -1,6 +1,9 @@
 # app/config/database.py
 
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.data.data_class import settings
@@ -10,12 +13,21 @@ from app.models.status import StatusBase, Status
 # Database connection URL constructed using settings
 DATABASE_URL = f"mysql+pymysql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
 
+# Async driver URL for the request path
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+
 # SQLAlchemy engine for database connection
 engine = create_engine(DATABASE_URL)
 
 # SessionLocal is a factory for creating database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory used by the route handlers, so a slow query
+# does not block the event loop. Objects are not expired on commit because an
+# AsyncSession cannot lazy load them afterwards.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for SQLAlchemy models
 Base = declarative_base()
 
@@ -34,6 +46,58 @@ def get_db():
     finally:
         db.close()
 
+@contextmanager
+def advisory_lock(connection: Connection, name: str, timeout: int = 0):
+    """
+    Hold a named lock shared by all workers for the duration of the block.
+
+    Parameters:
+    - connection (Connection): The connection owning the lock.
+    - name (str): The lock name.
+    - timeout (int): Seconds to wait for the lock.
+
+    Yields:
+    - bool: True if the lock was acquired. Backends without named locks always acquire.
+    """
+    if connection.dialect.name != "mysql":
+        yield True
+        return
+    acquired = connection.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": timeout}).scalar() == 1
+    # End the transaction autobegun by GET_LOCK, the lock belongs to the session and outlives it
+    connection.commit()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+@contextmanager
+def batch_transaction(connection: Connection):
+    """
+    Commit the statements of the block, or roll them back if it raises.
+
+    Unlike Connection.begin(), this also works when a statement run before the block
+    (such as GET_LOCK) left a transaction autobegun; that transaction ends with the block.
+    """
+    try:
+        yield connection
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+
+async def get_async_db():
+    """
+    Dependency function to provide an async database session.
+
+    Yields:
+    - session: The SQLAlchemy AsyncSession.
+
+    Closes the session after use to return the connection to the pool.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def create_roles():
     """
     Function to create predefined roles if they don't exist in the database.
@@ -0,0 +1,132 @@
+# app/config/migrations.py
+
+from app.models.tasks import Task, TaskHistory, TaskDocument, TaskStats, ListVersion, ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, inspect, select
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.expression import text
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+from app.config.database import engine, advisory_lock
+
+# create_all only creates missing tables, every later schema change on an
+# existing table is a numbered migration recorded in schema_migrations.
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(250), nullable=False),
+    Column("applied_at", TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+)
+
+# Registered migrations as (version, description, upgrade function)
+MIGRATIONS = []
+
+def migration(version: int, description: str):
+    """
+    Decorator registering an upgrade function taking a Connection.
+    """
+    def decorator(upgrade):
+        MIGRATIONS.append((version, description, upgrade))
+        return upgrade
+    return decorator
+
+def create_indexes(connection: Connection, model, *names: str):
+    """
+    Create the named indexes declared on a model, skipping the ones that already exist.
+    """
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(bind=connection, checkfirst=True)
+
+def add_columns(connection: Connection, model, *names: str):
+    """
+    Add the named columns declared on a model, skipping the ones that already exist.
+    """
+    table = model.__table__
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        column_ddl = CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+@migration(1, "Composite indexes for task filters, task history and task documents")
+def add_task_filter_indexes(connection: Connection):
+    create_indexes(
+        connection, Task,
+        "ix_tasks_user_id_due_date_id",
+        "ix_tasks_role_id_due_date_id",
+        "ix_tasks_status_id_due_date_id",
+        "ix_tasks_due_date_id",
+    )
+    create_indexes(connection, TaskHistory, "ix_tasks_histories_task_id_created_at")
+    create_indexes(connection, TaskDocument, "ix_tasks_documents_task_id")
+
+@migration(2, "Content hash and original file name of task documents")
+def add_document_content_hash(connection: Connection):
+    add_columns(connection, TaskDocument, "content_hash", "file_name")
+    create_indexes(connection, TaskDocument, "ix_tasks_documents_content_hash")
+
+@migration(3, "Task statistics summary table")
+def add_task_stats(connection: Connection):
+    from app.modules.tasks.task_stats import rebuild_task_stats
+    TaskStats.__table__.create(bind=connection, checkfirst=True)
+    rebuild_task_stats(connection)
+
+@migration(4, "Full-text index on task titles and descriptions")
+def add_task_fulltext_index(connection: Connection):
+    create_indexes(connection, Task, "ix_tasks_title_description_fulltext")
+
+@migration(5, "Version counters of the cached list scopes")
+def add_list_versions(connection: Connection):
+    ListVersion.__table__.create(bind=connection, checkfirst=True)
+
+@migration(6, "Thumbnails of image documents")
+def add_document_thumbnail(connection: Connection):
+    add_columns(connection, TaskDocument, "thumbnail_path")
+
+@migration(7, "Archive tables of completed tasks")
+def add_task_archive(connection: Connection):
+    for model in (ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument):
+        model.__table__.create(bind=connection, checkfirst=True)
+    create_indexes(connection, Task, "ix_tasks_status_id_updated_at")
+
+@migration(8, "Document path indexes for the upload garbage collector")
+def add_document_path_indexes(connection: Connection):
+    create_indexes(connection, TaskDocument, "ix_tasks_documents_document_path")
+    create_indexes(connection, ArchivedTaskDocument, "ix_tasks_documents_archive_document_path")
+
+@migration(9, "Updated_at index for the due date reminder poll")
+def add_task_updated_at_index(connection: Connection):
+    create_indexes(connection, Task, "ix_tasks_updated_at")
+
+@migration(10, "Overdue marker of tasks, flagged once per due date")
+def add_task_overdue_at(connection: Connection):
+    add_columns(connection, Task, "overdue_at")
+    add_columns(connection, ArchivedTask, "overdue_at")
+
+def run_migrations(bind: Engine = engine):
+    """
+    Apply the pending migrations in version order.
+
+    Workers starting together serialize on a named lock, so each migration runs once.
+    """
+    with bind.connect() as connection:
+        with advisory_lock(connection, "schema_migrations", timeout=60) as acquired:
+            if not acquired:
+                raise RuntimeError("Timed out waiting for the schema migration lock")
+            migration_metadata.create_all(bind=connection)
+            connection.commit()
+            applied = set(connection.scalars(select(schema_migrations.c.version)))
+            for version, description, upgrade in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in applied:
+                    continue
+                upgrade(connection)
+                connection.execute(insert(schema_migrations).values(version=version, description=description))
+                connection.commit()
+
+# Apply pending migrations manually: python -m app.config.migrations
+if __name__ == "__main__":
+    run_migrations()
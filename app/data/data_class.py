@@ -25,8 +25,48 @@ class Settings(BaseSettings):
     - secret_key (str): Secret key for JWT token encoding and decoding.
     - algorithm (str): Algorithm used for JWT token encoding and decoding.
     - access_token_expire_minutes (int): Expiration time for access tokens in minutes.
+    - principal_cache_max_entries (int): Number of authenticated users kept by the in-process principal cache.
+    - principal_cache_ttl_seconds (int): How long a cached principal is served, 0 disables the cache.
+    - password_hash_workers (int): Number of threads hashing and verifying passwords with bcrypt.
+
+    - rate_limit_enabled (bool): Rate limit /user/login and /forgot_password.
+    - rate_limit_window_seconds (int): Window the request limits below are counted over.
+    - rate_limit_max_keys (int): Number of rate limit buckets kept by the in-process backend.
+    - login_ip_limit (int): Login attempts per window from one client address.
+    - login_email_limit (int): Login attempts per window on one account.
+    - forgot_password_ip_limit (int): Password reset requests per window from one client address.
+    - forgot_password_email_limit (int): Password reset requests per window for one account.
     - base_url (str): base url for accessing the photos
 
+    - default_page_size (int): Number of rows returned by list endpoints when no limit is given.
+    - max_page_size (int): Upper bound for the limit accepted by list endpoints.
+    - export_batch_size (int): Number of tasks fetched per round trip by the streaming export.
+    - bulk_batch_size (int): Number of tasks inserted per statement by the bulk endpoints.
+
+    - max_upload_size (int): Maximum size in bytes of an uploaded file.
+    - upload_chunk_size (int): Size in bytes of the chunks uploads are written to disk with.
+
+    - reminders_enabled (bool): Run the due date reminder scheduler in this process, the workers elect one to send.
+    - reminder_lead_minutes (int): How long before the due date the reminder is sent.
+    - reminder_window_minutes (int): How far ahead the scheduler loads reminders into memory.
+    - reminder_poll_seconds (int): How often the elected scheduler picks up the tasks written by other workers, and the others retry the election.
+    - overdue_sweep_minutes (int): Interval between two runs of the overdue task sweeper, 0 disables it.
+    - archive_after_days (int): Age in days after its last update at which a completed task is archived.
+    - archive_interval_minutes (int): Interval between two runs of the task archiver, 0 disables it.
+
+    - list_cache_max_entries (int): Number of task list pages kept by the in-process cache.
+    - list_cache_ttl_seconds (int): How long a cached task list page is served.
+
+    - upload_gc_minutes (int): Interval between two runs of the upload garbage collector, 0 disables it.
+    - upload_gc_grace_minutes (int): Age below which an unreferenced upload file is kept.
+
+    - thumbnail_size (int): Maximum width and height in pixels of image thumbnails.
+    - thumbnail_workers (int): Number of processes generating thumbnails.
+
+    - document_cache_max_age (int): Seconds clients may cache a downloaded document.
+    - download_offload (str): "x-accel-redirect" or "x-sendfile" to let the front proxy send the document bytes, empty to send them from the app.
+    - download_accel_prefix (str): Internal proxy location mapped to static/uploads, for X-Accel-Redirect.
+
     Configurations:
     - env_file (str): The name of the .env file to load settings from.
     """
@@ -44,9 +84,49 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    principal_cache_max_entries: int = 10000
+    principal_cache_ttl_seconds: int = 30
+    password_hash_workers: int = 4
+
+    rate_limit_enabled: bool = True
+    rate_limit_window_seconds: int = 60
+    rate_limit_max_keys: int = 100000
+    login_ip_limit: int = 20
+    login_email_limit: int = 5
+    forgot_password_ip_limit: int = 5
+    forgot_password_email_limit: int = 3
 
     base_url: str
     otp_expire: int
+
+    default_page_size: int = 100
+    max_page_size: int = 1000
+    export_batch_size: int = 1000
+    bulk_batch_size: int = 1000
+
+    max_upload_size: int = 20 * 1024 * 1024
+    upload_chunk_size: int = 1024 * 1024
+
+    reminders_enabled: bool = True
+    reminder_lead_minutes: int = 24 * 60
+    reminder_window_minutes: int = 6 * 60
+    reminder_poll_seconds: int = 60
+    overdue_sweep_minutes: int = 15
+    archive_after_days: int = 90
+    archive_interval_minutes: int = 60
+
+    list_cache_max_entries: int = 1000
+    list_cache_ttl_seconds: int = 60
+
+    upload_gc_minutes: int = 60
+    upload_gc_grace_minutes: int = 60
+
+    thumbnail_size: int = 320
+    thumbnail_workers: int = 2
+
+    document_cache_max_age: int = 365 * 24 * 60 * 60
+    download_offload: str = ""
+    download_accel_prefix: str = "/protected/uploads/"
     
     class Config:
         env_file = ".env"
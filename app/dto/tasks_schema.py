@@ -1,28 +1,126 @@
 # app/dto/tasks_schema.py
 
 from __future__ import annotations
-from pydantic import BaseModel
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_serializer, field_validator
 from datetime import date, datetime
-from typing import Optional, List, Union
+from typing import Any, Optional, List, Union
+from app.data.data_class import settings
+from app.dto.users_schemas import UserOut
 
 class CreateTask(BaseModel):
     """
     Pydantic model for creating a new task.
     """
-    title: str
-    description: str
+    # The lengths of the task columns
+    title: str = Field(max_length=100)
+    description: str = Field(max_length=250)
     due_date: date
     status_id : int
     user_id: int
 
+# URL of a document, served after the permission check of /tasks/documents/{id}
+def document_url(document_id: int) -> str:
+    return f"{settings.base_url}/tasks/documents/{document_id}"
+
+# URL of the thumbnail of a document, checked the same way
+def thumbnail_url(document_id: int) -> str:
+    return f"{document_url(document_id)}/thumbnail"
+
+class DocumentOut(BaseModel):
+    """
+    Pydantic model for returning a task document, read from a TaskDocument row.
+    The stored paths are replaced by the download URLs of the document and its thumbnail.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    document_path: str
+    thumbnail_path: Optional[str] = None
+
+    @field_validator("document_path")
+    @classmethod
+    def document_download_url(cls, path: str, info: ValidationInfo) -> str:
+        return document_url(info.data["id"])
+
+    @field_validator("thumbnail_path")
+    @classmethod
+    def thumbnail_download_url(cls, path: Optional[str], info: ValidationInfo) -> Optional[str]:
+        return thumbnail_url(info.data["id"]) if path else None
+
+class TaskOut(BaseModel):
+    """
+    Pydantic model for returning task details, read from a Task or ArchivedTask row with its documents loaded.
+    """
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status_id: int
+    due_date: datetime
+    user_id: Optional[int] = None
+    role_id: int
+    created_by_id: int
+    updated_by_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    # Set on archived tasks only
+    archived_at: Optional[datetime] = None
+    document_path: List[DocumentOut] = Field(default_factory=list, validation_alias="documents")
+
+class TaskSearchOut(TaskOut):
+    """
+    Pydantic model for returning a task found by the full-text search, with its relevance score.
+    """
+    score: float
+
+class HistoryEntryOut(BaseModel):
+    """
+    Pydantic model for returning one task history entry.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    comments: Optional[str] = None
+    status_id: int
+    created_at: datetime
+
+class HistoryOut(BaseModel):
+    """
+    Pydantic model for returning a page of the history of a task.
+    """
+    task_id: int
+    due_date: datetime
+    history: List[HistoryEntryOut]
+    next_history_cursor: Optional[str] = None
+    archived: bool = False
+
 class ResponseData(BaseModel):
     status: bool
     message: str
-    data: Union[dict, list, None]
+    # Tried in order, so plain dicts are never coerced into one of the models
+    data: Union[dict, TaskOut, UserOut, list, None] = Field(union_mode="left_to_right")
+    next_cursor: Optional[str] = None
+
+    # Serialized by the type of the value: matching it against each member of the
+    # union first costs as much again as encoding a page of tasks
+    @field_serializer("data")
+    def serialize_data(self, data) -> Any:
+        return data
 
     class Config:
         orm_mode = True
 
+class ModelResponse(Response):
+    """
+    JSON response of a ResponseData, serialized once by pydantic-core.
+
+    Returned by the list endpoints: a model returned as is is dumped to dicts and
+    validated again against response_model by FastAPI before being encoded.
+    """
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode()
 
 class CreateHistory(BaseModel):
     """
@@ -31,6 +129,14 @@ class CreateHistory(BaseModel):
     status_id: int
     comments: Optional[str]
 
+class BulkStatusUpdate(BaseModel):
+    """
+    Pydantic model for moving many tasks to a new status at once.
+    """
+    task_ids: List[int]
+    status_id: int
+    comments: Optional[str] = None
+
 class TaskHistoryResponse(BaseModel):
     """
     Pydantic model for returning task history details.
@@ -51,5 +157,6 @@ class DocumentResponseModel(BaseModel):
     Pydantic model for returning document response details.
     """
     document_path: str
+    thumbnail_path: Optional[str] = None
 
 
@@ -1,7 +1,8 @@
 # app/dto/users_schema.py
 
 from __future__ import annotations
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from datetime import datetime
 from typing import Optional
 from app.permissions.roles import Role
 
@@ -43,3 +44,18 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr]
     old_password: str
     new_password: str
+
+class UserOut(BaseModel):
+    """
+    Pydantic model for returning user details, read from a User row.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    name: Optional[str] = None
+    role_id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+    updated_by: Optional[int] = None
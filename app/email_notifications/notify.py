@@ -94,3 +94,34 @@ async def send_reset_password_mail(recipient_email, user, otp, expire_in_minutes
     except Exception as e:
         logger.error(f"Something went wrong in reset password email")
         logger.error(str(e))
+
+async def send_due_date_reminder(recipient_email, user, title, due_date):
+    """
+    Sends a reminder email for a task whose due date is approaching.
+
+    Args:
+    - recipient_email (str): Email address of the assignee.
+    - user (str): Name of the assignee.
+    - title (str): Title of the task.
+    - due_date (datetime): Due date of the task.
+
+    Raises:
+    - Exception: If an error occurs during email sending.
+    """
+    template_body = {
+        "user": user,
+        "title": title,
+        "due_date": due_date.strftime('%Y-%m-%d'),
+    }
+    try:
+        message = MessageSchema(
+            subject=f"Reminder: {title} is due soon",
+            recipients=[recipient_email],
+            template_body=template_body,
+            subtype=MessageType.html
+        )
+        fm = FastMail(conf)
+        await fm.send_message(message, template_name="due_date_reminder.html")
+    except Exception as e:
+        logger.error(f"Something went wrong in due date reminder email")
+        logger.error(str(e))
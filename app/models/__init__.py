@@ -1,5 +1,5 @@
 # app/models/__init__.py
 
 from .users import Token, User
-from .tasks import TaskDocument, Task, TaskHistory
+from .tasks import TaskDocument, Task, TaskHistory, TaskStats, ListVersion, ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument
 from .roles import Role
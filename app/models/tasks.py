@@ -1,6 +1,6 @@
 # app/models/tasks.py
 
-from sqlalchemy import create_engine, Column, Integer, String, Enum, ForeignKey, Date
+from sqlalchemy import create_engine, BigInteger, Column, Integer, String, Enum, ForeignKey, Date, Index
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
@@ -29,11 +29,31 @@ class Task(Base):
     updated_at = Column(TIMESTAMP, nullable=True, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
     created_by_id = Column(Integer, ForeignKey(User.id, ondelete='CASCADE', onupdate='NO ACTION'), nullable=False)
     updated_by_id = Column(Integer, ForeignKey(User.id, ondelete='CASCADE', onupdate='NO ACTION'), nullable=True)
+    # Due date the overdue sweep last flagged the task for, so it is flagged once per due date
+    overdue_at = Column(TIMESTAMP(timezone=True), nullable=True)
     # Relationships with User and TaskDocument models
     assigned_user = relationship(User, foreign_keys=[user_id])
     owner = relationship(User, foreign_keys=[created_by_id])
     updater = relationship(User, foreign_keys=[updated_by_id])
     documents = relationship("TaskDocument", back_populates="task", cascade="all, delete-orphan")
+
+    # Composite indexes for the list filters, all ending in (due_date, id) for keyset pagination
+    __table_args__ = (
+        # AGENT scope, /tasks/me and the user_id branch of the MANAGER scope
+        Index("ix_tasks_user_id_due_date_id", "user_id", "due_date", "id"),
+        # role_id branch of the MANAGER scope
+        Index("ix_tasks_role_id_due_date_id", "role_id", "due_date", "id"),
+        # status_id filter
+        Index("ix_tasks_status_id_due_date_id", "status_id", "due_date", "id"),
+        # SUPERADMIN listing and the due_date filter
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        # Completed tasks by age, read by the archiver
+        Index("ix_tasks_status_id_updated_at", "status_id", "updated_at"),
+        # Tasks written since the last poll of the reminder scheduler
+        Index("ix_tasks_updated_at", "updated_at"),
+        # /tasks/search, maintained by InnoDB on every insert, update and delete
+        Index("ix_tasks_title_description_fulltext", "title", "description", mysql_prefix="FULLTEXT"),
+    )
     
 
 class TaskHistory(Base):
@@ -50,6 +70,11 @@ class TaskHistory(Base):
     # Relationship with Task model
     task = relationship("Task", back_populates="history")
 
+    # History of a task in chronological order
+    __table_args__ = (
+        Index("ix_tasks_histories_task_id_created_at", "task_id", "created_at"),
+    )
+
 # Establish the bidirectional relationship between Task and TaskHistory models
 Task.history = relationship("TaskHistory", order_by=TaskHistory.created_at, back_populates="task")
 
@@ -61,7 +86,114 @@ class TaskDocument(Base):
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id", ondelete='CASCADE', onupdate='NO ACTION'))
     document_path = Column(String(255), nullable=False)
+    # SHA-256 of the content for documents kept in the content-addressed blob store
+    content_hash = Column(String(64), nullable=True)
+    file_name = Column(String(255), nullable=True)
+    # Resized preview of image documents, set once the background thumbnailer is done
+    thumbnail_path = Column(String(255), nullable=True)
     created_by_id = Column(Integer, ForeignKey(User.id, ondelete='CASCADE', onupdate='NO ACTION'), nullable=True)
     
     # Relationship with Task model
     task = relationship("Task", back_populates="documents")
+
+    # Documents of a task, and references to a blob
+    __table_args__ = (
+        Index("ix_tasks_documents_task_id", "task_id"),
+        Index("ix_tasks_documents_content_hash", "content_hash"),
+        # Reconciliation of the upload directory by the garbage collector
+        Index("ix_tasks_documents_document_path", "document_path"),
+    )
+
+class TaskStats(Base):
+    # Define the table name
+    __tablename__ = "tasks_stats"
+
+    # Number of tasks per (status, assignee, assignee role), kept up to date by the task services
+    status_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, primary_key=True, autoincrement=False)  # 0 for unassigned tasks
+    role_id = Column(Integer, primary_key=True, autoincrement=False)
+    task_count = Column(Integer, nullable=False, default=0)
+
+class ListVersion(Base):
+    # Define the table name
+    __tablename__ = "list_versions"
+
+    # Version of a list scope ("user:<id>", "role:<id>", "users"), bumped in the transaction of every write to it
+    scope = Column(String(32), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class ArchivedTask(Base):
+    # Define the table name
+    __tablename__ = "tasks_archive"
+
+    # Completed tasks moved out of tasks by the archiver, keeping their ids.
+    # No foreign keys: the rows are only read back, and removed with their user.
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(100))
+    description = Column(String(250))
+    status_id = Column(Integer, nullable=False)
+    due_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    role_id = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False)
+    updated_at = Column(TIMESTAMP, nullable=True)
+    created_by_id = Column(Integer, nullable=False)
+    updated_by_id = Column(Integer, nullable=True)
+    overdue_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    archived_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    # Same shape as the Task relationships, so the task schemas read both
+    documents = relationship(
+        "ArchivedTaskDocument",
+        primaryjoin="ArchivedTask.id == foreign(ArchivedTaskDocument.task_id)",
+        viewonly=True,
+    )
+    history = relationship(
+        "ArchivedTaskHistory",
+        primaryjoin="ArchivedTask.id == foreign(ArchivedTaskHistory.task_id)",
+        order_by="ArchivedTaskHistory.created_at",
+        viewonly=True,
+    )
+
+    # The list indexes of tasks, for include_archived
+    __table_args__ = (
+        Index("ix_tasks_archive_user_id_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_tasks_archive_role_id_due_date_id", "role_id", "due_date", "id"),
+        Index("ix_tasks_archive_due_date_id", "due_date", "id"),
+        Index("ix_tasks_archive_created_by_id", "created_by_id"),
+    )
+
+class ArchivedTaskHistory(Base):
+    # Define the table name
+    __tablename__ = "tasks_histories_archive"
+
+    # History of the archived tasks, keeping the ids
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    task_id = Column(Integer, nullable=False)
+    comments = Column(String(250))
+    status_id = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False)
+    archived_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (
+        Index("ix_tasks_histories_archive_task_id_created_at", "task_id", "created_at"),
+    )
+
+class ArchivedTaskDocument(Base):
+    # Define the table name
+    __tablename__ = "tasks_documents_archive"
+
+    # Documents of the archived tasks, keeping the ids; they still reference their blobs
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    task_id = Column(Integer, nullable=False)
+    document_path = Column(String(255), nullable=False)
+    content_hash = Column(String(64), nullable=True)
+    file_name = Column(String(255), nullable=True)
+    thumbnail_path = Column(String(255), nullable=True)
+    created_by_id = Column(Integer, nullable=True)
+    archived_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (
+        Index("ix_tasks_documents_archive_task_id", "task_id"),
+        Index("ix_tasks_documents_archive_content_hash", "content_hash"),
+        Index("ix_tasks_documents_archive_document_path", "document_path"),
+    )
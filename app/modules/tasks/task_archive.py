@@ -0,0 +1,111 @@
+# app/modules/tasks/task_archive.py
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+from app.models.tasks import Task, TaskHistory, TaskDocument, ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument
+from app.config.database import engine, advisory_lock, batch_transaction
+from app.data.data_class import settings
+from app.modules.tasks.task_reminders import COMPLETED_STATUS_ID
+from app.modules.tasks.task_stats import stats_key, stats_rows, stats_upsert
+from app.modules.tasks.task_versions import task_scopes, version_rows, version_upsert
+
+logger = logging.getLogger("uvicorn")
+
+def copy_to_archive(connection: Connection, model, archive, condition, archived_at: datetime):
+    """INSERT ... SELECT the rows of model matching condition into its archive table."""
+    columns = [column.name for column in model.__table__.columns]
+    connection.execute(
+        insert(archive).from_select(
+            columns + ["archived_at"],
+            select(*model.__table__.columns, literal(archived_at, TIMESTAMP)).where(condition),
+        )
+    )
+
+def archive_batch(connection: Connection, cutoff: datetime, batch_size: int) -> int:
+    """
+    Move one batch of completed tasks last updated before cutoff to the archive tables.
+
+    The candidates are read with a range scan on ix_tasks_status_id_updated_at and
+    locked; the task, history and document rows are copied with one INSERT ... SELECT
+    per table and deleted from the hot tables in the same transaction, together with
+    the summary counters and list versions. Blobs stay referenced by the archived
+    documents.
+
+    Returns:
+    - int: The number of tasks archived.
+    """
+    with batch_transaction(connection):
+        rows = connection.execute(
+            select(Task.id, Task.user_id, Task.role_id)
+            .filter(Task.status_id == COMPLETED_STATUS_ID, Task.updated_at < cutoff)
+            .order_by(Task.updated_at, Task.id)
+            .limit(batch_size)
+            .with_for_update()
+        ).all()
+        if not rows:
+            return 0
+        task_ids = [row.id for row in rows]
+        archived_at = datetime.utcnow()
+        copy_to_archive(connection, Task, ArchivedTask, Task.id.in_(task_ids), archived_at)
+        copy_to_archive(connection, TaskHistory, ArchivedTaskHistory, TaskHistory.task_id.in_(task_ids), archived_at)
+        copy_to_archive(connection, TaskDocument, ArchivedTaskDocument, TaskDocument.task_id.in_(task_ids), archived_at)
+        # Children first, tasks_histories.task_id has no ON DELETE CASCADE
+        connection.execute(delete(TaskDocument).where(TaskDocument.task_id.in_(task_ids)))
+        connection.execute(delete(TaskHistory).where(TaskHistory.task_id.in_(task_ids)))
+        connection.execute(delete(Task).where(Task.id.in_(task_ids)))
+        # The summary counters only count the hot tasks
+        deltas = Counter()
+        for _, user_id, role_id in rows:
+            deltas[stats_key(COMPLETED_STATUS_ID, user_id, role_id)] -= 1
+        connection.execute(stats_upsert(connection.dialect.name), stats_rows(deltas))
+        connection.execute(version_upsert(connection.dialect.name), version_rows(task_scopes((row.user_id, row.role_id) for row in rows)))
+    return len(rows)
+
+def archive_completed_tasks(
+        bind: Engine = engine,
+        older_than: timedelta = timedelta(days=settings.archive_after_days),
+        batch_size: int = settings.bulk_batch_size,
+    ) -> int:
+    """
+    Archive every completed task not updated for older_than.
+
+    Runs in bounded batches until no candidate is left; archived tasks leave the
+    candidate set, so no cursor is needed. Only one worker archives at a time, the
+    others skip the run.
+
+    Returns:
+    - int: The number of tasks archived, 0 if another worker holds the lock.
+    """
+    archived = 0
+    cutoff = datetime.utcnow() - older_than
+    with bind.connect() as connection:
+        with advisory_lock(connection, "task_archive") as acquired:
+            if not acquired:
+                return 0
+            while True:
+                count = archive_batch(connection, cutoff, batch_size)
+                archived += count
+                if count < batch_size:
+                    return archived
+
+async def run_task_archiver():
+    """Archive every settings.archive_interval_minutes, started from the application lifespan."""
+    while True:
+        try:
+            archived = await run_in_threadpool(archive_completed_tasks)
+            if archived:
+                logger.info(f"Archived {archived} completed tasks")
+        except Exception as e:
+            logger.error("Something went wrong in the task archiver")
+            logger.error(str(e))
+        await asyncio.sleep(settings.archive_interval_minutes * 60)
+
+# Archive manually: python -m app.modules.tasks.task_archive
+if __name__ == "__main__":
+    print(archive_completed_tasks())
@@ -0,0 +1,90 @@
+# app/modules/tasks/task_cache.py
+
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from app.auth.auth import get_current_user
+from app.data.data_class import settings
+
+class CacheBackend(ABC):
+    """
+    Store of the list cache. Values are the tuples returned by the list services;
+    a shared store (e.g. Redis) implementing get and set can replace the in-process one.
+    """
+    @abstractmethod
+    async def get(self, key: str):
+        """Return the value stored under key, None when missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value, ttl: int):
+        """Store value under key for ttl seconds."""
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU store with a TTL per entry."""
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class ListCache:
+    """
+    Cache in front of the task list services.
+
+    Keys include the list_versions version of the caller's scope, which every task
+    write bumps in its transaction: entries of a changed scope are never read again
+    and age out of the LRU, in every worker, while other scopes keep theirs.
+    """
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key_parts: list, loader: Callable[[], Awaitable[tuple]]) -> tuple:
+        key = json.dumps(key_parts, default=str)
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await loader()
+        # Only successful results, errors such as an invalid cursor are cheap anyway
+        if value[0]:
+            await self.backend.set(key, value, self.ttl)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.backend) if isinstance(self.backend, MemoryCacheBackend) else None,
+        }
+
+# Part of the cache key identifying the tasks visible to the user, shared by all SUPERADMINs
+def task_list_scope(current_user: get_current_user) -> Optional[str]:
+    if current_user.role_id == 1:
+        return "all"
+    return f"{current_user.role_id}:{current_user.id}"
+
+task_list_cache = ListCache(MemoryCacheBackend(settings.list_cache_max_entries), settings.list_cache_ttl_seconds)
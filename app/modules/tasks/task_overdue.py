@@ -0,0 +1,102 @@
+# app/modules/tasks/task_overdue.py
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from app.models.tasks import Task, TaskHistory
+from app.config.database import engine, advisory_lock, batch_transaction
+from app.data.data_class import settings
+from app.modules.tasks.task_stats import stats_key, stats_rows, stats_upsert
+from app.modules.tasks.task_versions import task_scopes, version_rows, version_upsert
+
+logger = logging.getLogger("uvicorn")
+
+# Statuses a task can be overdue in, and the status it is flagged with
+OPEN_STATUS_IDS = [1, 2, 3]
+ON_HOLD_STATUS_ID = 4
+OVERDUE_COMMENT = "Overdue: due date passed"
+
+def flag_overdue_batch(connection: Connection, now: datetime, batch_size: int) -> int:
+    """
+    Flag one batch of overdue tasks in its own transaction.
+
+    The candidates are read with a range scan on ix_tasks_status_id_due_date_id and
+    locked, moved to On-Hold with one UPDATE, and logged with one executemany INSERT
+    into the history, together with the summary counters and list versions.
+
+    overdue_at records the due date a task was flagged for: a task put back in
+    progress past its due date is left alone until its due date changes.
+
+    Returns:
+    - int: The number of tasks flagged.
+    """
+    with batch_transaction(connection):
+        rows = connection.execute(
+            select(Task.id, Task.status_id, Task.user_id, Task.role_id)
+            .filter(
+                Task.status_id.in_(OPEN_STATUS_IDS),
+                Task.due_date < now,
+                or_(Task.overdue_at.is_(None), Task.overdue_at != Task.due_date),
+            )
+            .order_by(Task.due_date, Task.id)
+            .limit(batch_size)
+            .with_for_update()
+        ).all()
+        if not rows:
+            return 0
+        task_ids = [row.id for row in rows]
+        connection.execute(update(Task).where(Task.id.in_(task_ids)).values(status_id=ON_HOLD_STATUS_ID, overdue_at=Task.due_date))
+        connection.execute(insert(TaskHistory), [
+            {"task_id": task_id, "status_id": ON_HOLD_STATUS_ID, "comments": OVERDUE_COMMENT}
+            for task_id in task_ids
+        ])
+        deltas = Counter()
+        for _, status_id, user_id, role_id in rows:
+            deltas[stats_key(status_id, user_id, role_id)] -= 1
+            deltas[stats_key(ON_HOLD_STATUS_ID, user_id, role_id)] += 1
+        connection.execute(stats_upsert(connection.dialect.name), stats_rows(deltas))
+        connection.execute(version_upsert(connection.dialect.name), version_rows(task_scopes((row.user_id, row.role_id) for row in rows)))
+    return len(rows)
+
+def sweep_overdue_tasks(bind: Engine = engine, batch_size: int = settings.bulk_batch_size) -> int:
+    """
+    Move every task past its due date and not yet completed to On-Hold, once per due date.
+
+    Runs in bounded batches until no candidate is left; flagged tasks leave the
+    candidate set, so no cursor is needed and the table is never loaded whole. Only
+    one worker sweeps at a time, the others skip the run.
+
+    Returns:
+    - int: The number of tasks flagged, 0 if another worker holds the lock.
+    """
+    flagged = 0
+    now = datetime.utcnow()
+    with bind.connect() as connection:
+        with advisory_lock(connection, "overdue_sweep") as acquired:
+            if not acquired:
+                return 0
+            while True:
+                count = flag_overdue_batch(connection, now, batch_size)
+                flagged += count
+                if count < batch_size:
+                    return flagged
+
+async def run_overdue_sweeper():
+    """Sweep every settings.overdue_sweep_minutes, started from the application lifespan."""
+    while True:
+        try:
+            flagged = await run_in_threadpool(sweep_overdue_tasks)
+            if flagged:
+                logger.info(f"Flagged {flagged} overdue tasks")
+        except Exception as e:
+            logger.error("Something went wrong in the overdue task sweep")
+            logger.error(str(e))
+        await asyncio.sleep(settings.overdue_sweep_minutes * 60)
+
+# Sweep manually: python -m app.modules.tasks.task_overdue
+if __name__ == "__main__":
+    print(sweep_overdue_tasks())
@@ -0,0 +1,266 @@
+# app/modules/tasks/task_reminders.py
+
+import asyncio
+import heapq
+import logging
+from contextlib import ExitStack
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+from app.models.tasks import Task
+from app.models.users import User
+from app.config.database import AsyncSessionLocal, advisory_lock, engine
+from app.data.data_class import settings
+from app.email_notifications.notify import send_due_date_reminder
+
+logger = logging.getLogger("uvicorn")
+
+# Reminders are not sent for completed tasks
+COMPLETED_STATUS_ID = 5
+
+# Due dates as naive UTC datetimes, the way they are stored
+def as_utc(value) -> datetime:
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time.min)
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class ReminderScheduler:
+    """
+    In-process scheduler sending due date reminders through notify.py.
+
+    Every worker runs one, the one holding the "due_date_reminders" named lock sends
+    the reminders; the others retry the lock every poll interval and take over when
+    the holder goes away. The lock is held on a connection of its own for as long as
+    the scheduler runs.
+
+    Only the reminders falling in the next settings.reminder_window_minutes are kept
+    in memory, in a heap ordered by fire time. The window is loaded with one range
+    scan on the due_date index when the lock is acquired and again each time it runs
+    out. In between, writes served by this worker keep the heap up to date with
+    schedule() and cancel(), and the tasks written by the other workers are picked
+    up every settings.reminder_poll_seconds with a range scan on the updated_at
+    index. Cancelled and rescheduled entries are dropped lazily when they reach the
+    top of the heap. Fired reminders are remembered until their due date passes, so
+    updating a task inside its lead time does not send the same reminder again; only
+    a new due date does.
+
+    When a reminder fires the task is read again, so a task completed, deleted or
+    reassigned by another worker is never reminded about. Reminders whose time
+    passed while no scheduler held the lock are not sent.
+    """
+    def __init__(self, lead: timedelta, window: timedelta, poll: timedelta, bind: Engine = engine):
+        self.lead = lead
+        self.window = window
+        self.poll = poll
+        self.bind = bind
+        self._heap = []
+        self._fire_at = {}
+        # (task_id, fire_at) of the reminders already fired
+        self._sent = set()
+        self._window_end = None
+        self._reload = False
+        # Database time of the last load or poll, and local time of the next poll
+        self._polled_at = None
+        self._next_poll = None
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        # The connection holding the lock and its release, set while elected
+        self._lock: Optional[ExitStack] = None
+        self._lock_connection = None
+        self._leader = False
+
+    async def start(self):
+        await self._elect()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        await self._resign()
+
+    def schedule(self, task_id: int, due_date):
+        """Schedule, or move, the reminder of a task."""
+        if not self._leader:
+            return
+        fire_at = as_utc(due_date) - self.lead
+        if fire_at >= self._window_end or self._fire_at.get(task_id) == fire_at or (task_id, fire_at) in self._sent:
+            return
+        self._fire_at[task_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, task_id))
+        if self._heap[0] == (fire_at, task_id):
+            self._wakeup.set()
+
+    def cancel(self, task_id: int):
+        """Drop the reminder of a task, its heap entry is skipped when reached."""
+        self._fire_at.pop(task_id, None)
+
+    def reload(self, due_dates: Iterable):
+        """
+        Reload the window if any of the due dates falls in it, for writes that do
+        not know the ids of the tasks they create.
+        """
+        if not self._leader:
+            return
+        if any(as_utc(due_date) - self.lead < self._window_end for due_date in due_dates):
+            self._reload = True
+            self._wakeup.set()
+
+    def _acquire_lock(self) -> bool:
+        if self._lock is not None:
+            return True
+        stack = ExitStack()
+        try:
+            connection = stack.enter_context(self.bind.connect())
+            acquired = stack.enter_context(advisory_lock(connection, "due_date_reminders"))
+        except BaseException:
+            stack.close()
+            raise
+        if not acquired:
+            stack.close()
+            return False
+        self._lock, self._lock_connection = stack, connection
+        return True
+
+    def _lock_alive(self) -> bool:
+        # The lock is released by the server when its connection drops
+        try:
+            self._lock_connection.execute(text("SELECT 1"))
+            self._lock_connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _release_lock(self):
+        stack, self._lock, self._lock_connection = self._lock, None, None
+        if stack is not None:
+            try:
+                stack.close()
+            except Exception:
+                # The lock went away with its connection
+                pass
+
+    async def _elect(self):
+        """Take the lock if it is free and load the window."""
+        if not await run_in_threadpool(self._acquire_lock):
+            return
+        await self._load(datetime.utcnow())
+        if not self._leader:
+            logger.info("Sending the due date reminders from this worker")
+        self._leader = True
+
+    async def _resign(self):
+        self._leader = False
+        self._heap, self._fire_at = [], {}
+        await run_in_threadpool(self._release_lock)
+
+    async def _load(self, now: datetime):
+        window_end = now + self.window
+        async with AsyncSessionLocal() as db:
+            polled_at = await db.scalar(select(func.now()))
+            rows = (await db.execute(
+                select(Task.id, Task.due_date)
+                .filter(Task.due_date > now + self.lead, Task.due_date < window_end + self.lead)
+                .filter(Task.status_id != COMPLETED_STATUS_ID)
+            )).all()
+        # Keep what was scheduled while the query ran
+        fire_at = {task_id: as_utc(due_date) - self.lead for task_id, due_date in rows}
+        fire_at.update((task_id, at) for task_id, at in self._fire_at.items() if at < window_end)
+        self._fire_at = fire_at
+        self._heap = [(at, task_id) for task_id, at in fire_at.items()]
+        heapq.heapify(self._heap)
+        self._window_end = window_end
+        self._reload = False
+        self._polled_at, self._next_poll = polled_at, now + self.poll
+        self._sent = {(task_id, at) for task_id, at in self._sent if at + self.lead > now}
+
+    async def _poll(self, now: datetime):
+        """
+        Schedule the tasks of the window written since the last poll, by this
+        worker or another one. updated_at is compared with the database clock, and
+        the previous interval is read again to catch the writes committed after
+        it was stamped; scheduling a task twice is a no-op.
+        """
+        if not await run_in_threadpool(self._lock_alive):
+            logger.warning("Lost the due date reminder lock")
+            await self._resign()
+            return
+        async with AsyncSessionLocal() as db:
+            polled_at = await db.scalar(select(func.now()))
+            rows = (await db.execute(
+                select(Task.id, Task.due_date)
+                .filter(Task.updated_at >= self._polled_at - self.poll)
+                # Like schedule(), a task written inside its lead time is reminded at once
+                .filter(Task.due_date > now, Task.due_date < self._window_end + self.lead)
+                .filter(Task.status_id != COMPLETED_STATUS_ID)
+            )).all()
+        for task_id, due_date in rows:
+            self.schedule(task_id, due_date)
+        self._polled_at, self._next_poll = polled_at, now + self.poll
+
+    async def _run(self):
+        while True:
+            if not self._leader:
+                await asyncio.sleep(self.poll.total_seconds())
+                try:
+                    await self._elect()
+                except Exception as e:
+                    logger.error("Something went wrong in due date reminders")
+                    logger.error(str(e))
+                continue
+            deadline = min(self._heap[0][0] if self._heap else self._window_end, self._window_end, self._next_poll)
+            timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            now = datetime.utcnow()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, task_id = heapq.heappop(self._heap)
+                if self._fire_at.get(task_id) == fire_at:
+                    del self._fire_at[task_id]
+                    self._sent.add((task_id, fire_at))
+                    due.append(task_id)
+            try:
+                if due:
+                    await self._send(due, now)
+                if self._reload or now >= self._window_end:
+                    await self._load(now)
+                elif now >= self._next_poll:
+                    await self._poll(now)
+            except Exception as e:
+                logger.error("Something went wrong in due date reminders")
+                logger.error(str(e))
+                # Retry on the next poll instead of spinning
+                self._next_poll = now + self.poll
+                if now >= self._window_end:
+                    await asyncio.sleep(self.poll.total_seconds())
+
+    async def _send(self, task_ids: list, now: datetime):
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Task.id, Task.title, Task.due_date, User.email, User.name)
+                .join(User, User.id == Task.user_id)
+                .filter(Task.id.in_(task_ids), Task.status_id != COMPLETED_STATUS_ID)
+            )).all()
+        for task_id, title, due_date, email, name in rows:
+            # The due date may have been moved by another process
+            if as_utc(due_date) - self.lead <= now < as_utc(due_date):
+                await send_due_date_reminder(email, name, title, due_date)
+
+# Scheduler shared by the task services, started from the application lifespan
+reminders = ReminderScheduler(
+    lead=timedelta(minutes=settings.reminder_lead_minutes),
+    window=timedelta(minutes=settings.reminder_window_minutes),
+    poll=timedelta(seconds=settings.reminder_poll_seconds),
+)
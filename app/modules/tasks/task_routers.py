@@ -1,14 +1,22 @@
 # app/modules/tasks/routers.py
 
 import os
-from fastapi import Depends, APIRouter, Query,File, UploadFile, Form
-from sqlalchemy.orm import Session
-from app.config.database import get_db, msg
-from app.dto.tasks_schema import CreateTask, ResponseData,CreateHistory
-from app.modules.tasks.task_services import create_task, delete_task, view_all_tasks,get_tasks,update_task, get_task_history, upload_file
+from fastapi import Depends, APIRouter, Query,File, UploadFile, Form, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_async_db, msg
+from app.dto.tasks_schema import CreateTask, ResponseData, ModelResponse, CreateHistory, BulkStatusUpdate
+from app.modules.tasks.task_services import create_task, delete_task, view_all_tasks,get_tasks,update_task, get_task_history, upload_file, get_document, export_tasks, iter_bulk_items, bulk_create_tasks, bulk_update_task_status
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 from app.auth.auth import get_current_user 
+from app.modules.tasks.task_stats import get_task_stats
+from app.modules.tasks.task_search import search_tasks
+from app.modules.tasks.task_versions import task_list_version
+from app.modules.tasks.task_cache import task_list_cache, task_list_scope
+from utils import make_etag, etag_matches
+from app.data.data_class import settings
+from app.storage.downloads import document_response
 
 router = APIRouter()
 
@@ -19,16 +27,34 @@ static_directory = os.path.join(os.path.dirname(os.path.abspath("/static/uploads
 @router.get("/tasks/me",
             response_model=ResponseData, 
             summary="Get all tasks of current user", tags=["Tasks"])
-def get_all_tasks(
-    db: Session = Depends(get_db),
+async def get_all_tasks(
+    request: Request,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: get_current_user = Depends(),
 ):
     """
     Get list of all tasks for the current user.
+    - Pass the returned next_cursor as cursor to fetch the next page
+    - include_archived also lists the archived completed tasks, with their archived_at
+    - Send the returned ETag as If-None-Match to get a 304 while nothing changed
     """
     try:
-        status, message, data = get_tasks(db, current_user)
-        return ResponseData(status=status, message=message, data=data)
+        # Read before the rows: a write committing in between only makes the next poll fetch again
+        version = await task_list_version(db, current_user, own_tasks=True)
+        etag = make_etag(version, current_user.id, current_user.role_id, str(request.url.query))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        status, message, data, next_cursor = await task_list_cache.get_or_load(
+            ["tasks/me", version, current_user.id, limit, cursor, include_archived],
+            lambda: get_tasks(db, current_user, limit, cursor, include_archived),
+        )
+        return ModelResponse(
+            ResponseData(status=status, message=message, data=data, next_cursor=next_cursor),
+            headers={"ETag": etag} if status else None,
+        )
     except Exception as e:
         return ResponseData(
             status=False,
@@ -39,9 +65,13 @@ def get_all_tasks(
 # Filter all tasks with due_date and status_id
 @router.get("/tasks/all", response_model=ResponseData,tags=["Tasks"], summary="View all tasks along with filter from due_date and status_id_id")
 async def view_all_tasks_endpoint(
+    request: Request,
     status_id: Optional[int] = None, 
     due_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: get_current_user = Depends()):
     """
     Filter the tasks:
@@ -51,9 +81,68 @@ async def view_all_tasks_endpoint(
     - 3 = In-Progress
     - 4 = On-Hold
     - 5 = Completed
+
+    Pass the returned next_cursor as cursor to fetch the next page,
+    send the returned ETag as If-None-Match to get a 304 while nothing changed.
+    include_archived also lists the archived completed tasks, with their archived_at.
+    """
+    try:
+        # Read before the rows: a write committing in between only makes the next poll fetch again
+        version = await task_list_version(db, current_user)
+        etag = make_etag(version, current_user.id, current_user.role_id, str(request.url.query))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        status, message, data, next_cursor = await task_list_cache.get_or_load(
+            ["tasks/all", version, task_list_scope(current_user), status_id, due_date, limit, cursor, include_archived],
+            lambda: view_all_tasks(db, current_user, status_id, due_date, limit, cursor, include_archived),
+        )
+        return ModelResponse(
+            ResponseData(status=status, message=message, data=data, next_cursor=next_cursor),
+            headers={"ETag": etag} if status else None,
+        )
+    except Exception as e:
+        return ResponseData(
+            status=False,
+            message=msg["unexp_error"],
+            data={},
+        )
+
+# Full-text search
+@router.get("/tasks/search", response_model=ResponseData, tags=["Tasks"], summary="Search tasks by title and description")
+async def search_tasks_endpoint(
+    q: str = Query(..., min_length=1, max_length=250),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: get_current_user = Depends(),
+):
+    """
+    Search the visible tasks, most relevant first:
+    - Each task carries its relevance score
+    - Pass the returned next_cursor as cursor to fetch the next page
     """
     try:
-        status, message, data = view_all_tasks(db, current_user, status_id, due_date)
+        status, message, data, next_cursor = await search_tasks(db, current_user, q, limit, cursor)
+        return ModelResponse(ResponseData(status=status, message=message, data=data, next_cursor=next_cursor))
+    except Exception as e:
+        print(e)
+        return ResponseData(
+            status=False,
+            message=msg["unexp_error"],
+            data={},
+        )
+
+# Task counts for dashboards
+@router.get("/tasks/stats", response_model=ResponseData, tags=["Tasks"], summary="Task counts per status, assignee and role")
+async def task_stats_endpoint(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: get_current_user = Depends(),
+):
+    """
+    Counts of the tasks visible to the current user, per status_id, assignee user_id and role_id
+    """
+    try:
+        status, message, data = await get_task_stats(db, current_user)
         return ResponseData(status=status, message=message, data=data)
     except Exception as e:
         return ResponseData(
@@ -62,12 +151,48 @@ async def view_all_tasks_endpoint(
             data={},
         )
 
+# Hit and miss counters of the task list cache
+@router.get("/tasks/cache/stats", response_model=ResponseData, tags=["Tasks"], summary="Task list cache counters")
+async def task_cache_stats_endpoint(current_user: get_current_user = Depends()):
+    """
+    Hits, misses and entries of the task list cache of this worker (SUPERADMIN only)
+    """
+    if current_user.role_id != 1:
+        return ResponseData(status=False, message=msg["enough_perm"], data={})
+    return ResponseData(status=True, message=msg["cache_stats"], data=task_list_cache.stats())
+
+# EXPORT all tasks as a stream
+@router.get("/tasks/export", tags=["Tasks"], summary="Export tasks with history and documents as NDJSON or CSV")
+async def export_tasks_endpoint(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    status_id: Optional[int] = None,
+    due_date: Optional[date] = None,
+    current_user: get_current_user = Depends(),
+):
+    """
+    Stream every task visible to the current user, with its history and document URLs:
+    - format = ndjson: one JSON object per line
+    - format = csv: history is a JSON encoded column, document URLs are space separated
+    - Optional status_id and due_date filters as in /tasks/all
+    """
+    if status_id and status_id not in [1,2,3,4,5]:
+        return ResponseData(status=False, message=msg['inv_status'], data={})
+    if export_format == "csv":
+        media_type, filename = "text/csv", "tasks.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "tasks.ndjson"
+    return StreamingResponse(
+        export_tasks(current_user, status_id, due_date, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
 # CREATE tasks
 @router.post("/task/create",
               response_model=ResponseData,
               tags=["Tasks"],
                 summary="Create the new task")
-def create_task_route(
+async def create_task_route(
     title: str = Form(...),
     description: str = Form(...),
     due_date: date = Form(...),
@@ -75,7 +200,7 @@ def create_task_route(
     status_id: int = Form(...),
     current_user: get_current_user = Depends(),
     file: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create new tasks for existing users:
@@ -88,13 +213,43 @@ def create_task_route(
     """
     try:
         task = CreateTask(title=title, description=description, due_date=due_date, user_id=user_id, status_id=status_id)
-        status, message, data = create_task(db=db, task=task, status_id=status_id, current_user=current_user, file=file)
+        status, message, data = await create_task(db=db, task=task, status_id=status_id, current_user=current_user, file=file)
         return ResponseData(status=status, message=message, data=data)
     except ValueError:
         return ResponseData(status=False, message=msg['invalid_user'], data={})
     except Exception as e:
         return ResponseData(status=False, message=msg["invalid_user"], data={})
 
+# CREATE many tasks
+@router.post("/tasks/bulk/create",
+             response_model=ResponseData,
+             tags=["Tasks"],
+             summary="Create many tasks from a JSON array or an NDJSON stream")
+async def bulk_create_tasks_endpoint(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: get_current_user = Depends(),
+):
+    """
+    Create tasks in bulk:
+    - Body: a JSON array of tasks, or one task per line with Content-Type: application/x-ndjson
+    - Each task: title, description, due_date, status_id, user_id as in /task/create
+    - Returns one result per task, in input order
+    """
+    try:
+        results = await bulk_create_tasks(db, current_user, iter_bulk_items(request))
+        created = sum(1 for result in results if result["status"])
+        return ResponseData(
+            status=True,
+            message=msg["bulk_done"],
+            data={"created": created, "failed": len(results) - created, "results": results},
+        )
+    except ValueError:
+        return ResponseData(status=False, message=msg["inv_payload"], data={})
+    except Exception as e:
+        print(e)
+        return ResponseData(status=False, message=msg["unexp_error"], data={})
+
 # Update Task
 @router.put("/tasks/update/{task_id}",
              response_model=ResponseData,
@@ -102,7 +257,7 @@ def create_task_route(
 async def update_task_status(
     task_id: int,
     task: CreateHistory,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: get_current_user = Depends(),
 ):
     """
@@ -113,7 +268,32 @@ async def update_task_status(
         status_id = task.status_id
 
         # Call update_task function
-        status, message, data = update_task(db, task_id, task, status_id, current_user)
+        status, message, data = await update_task(db, task_id, task, status_id, current_user)
+        return ResponseData(status=status, message=message, data=data)
+    except Exception as e:
+        print(e)
+        return ResponseData(
+            status=False,
+            message=msg["unexp_error"],
+            data={},
+        )
+
+# Update many tasks
+@router.put("/tasks/bulk/update",
+            response_model=ResponseData,
+            tags=["Tasks"], summary="Move many tasks to a status and log their history")
+async def bulk_update_task_status_endpoint(
+    bulk: BulkStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: get_current_user = Depends(),
+):
+    """
+    Update the status of many tasks at once, e.g. when closing a sprint:
+    - Same permission rules as /tasks/update/{task_id}
+    - Returns the updated, not found and forbidden task ids
+    """
+    try:
+        status, message, data = await bulk_update_task_status(db, current_user, bulk)
         return ResponseData(status=status, message=message, data=data)
     except Exception as e:
         print(e)
@@ -127,12 +307,12 @@ async def update_task_status(
 @router.delete("/tasks/delete/{task_id}",
                response_model=ResponseData, tags=["Tasks"], 
                summary="Delete tasks with task_id")
-async def delete_task_endpoint(task_id: int, db: Session = Depends(get_db), current_user: get_current_user = Depends()):
+async def delete_task_endpoint(task_id: int, db: AsyncSession = Depends(get_async_db), current_user: get_current_user = Depends()):
     """
     Enter the id of task to delete
     """
     try:
-        status, message, data = delete_task(db, current_user, task_id)
+        status, message, data = await delete_task(db, current_user, task_id)
         return ResponseData(status=status, message=message, data=data)
     except Exception as e:
         return ResponseData(
@@ -145,15 +325,31 @@ async def delete_task_endpoint(task_id: int, db: Session = Depends(get_db), curr
 @router.get("/tasks/history", response_model=ResponseData, tags=["Tasks"], summary="View task History")
 async def view_task_history_endpoint(
     task_ids: Optional[List[int]] = Query(None, title="Task ids", description="Filter by task ids"),
-    db: Session = Depends(get_db),
+    status_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    history_limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    history_cursor: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: get_current_user = Depends(),
 ):
     """
-    History of tasks according to the changes made in tasks
+    History of tasks according to the changes made in tasks:
+    - status_id, created_from and created_to (exclusive) filter the history entries
+    - limit and cursor page through the tasks, next_cursor is returned
+    - history_limit bounds the entries per task, a task with more entries returns a
+      next_history_cursor to pass as history_cursor along with its single task id
+    - include_archived also returns the history of the archived tasks, flagged archived
     """
     try:
-        status, message, data = get_task_history(db, current_user, task_ids)
-        return ResponseData(status=status, message=message, data=data)
+        status, message, data, next_cursor = await get_task_history(
+            db, current_user, task_ids, status_id, created_from, created_to,
+            limit, cursor, history_limit, history_cursor, include_archived,
+        )
+        return ModelResponse(ResponseData(status=status, message=message, data=data, next_cursor=next_cursor))
     except Exception as e:
         return ResponseData(
             status=False,
@@ -165,21 +361,82 @@ async def view_task_history_endpoint(
 @router.post("/tasks/upload/{task_id}",
              tags=["Tasks"],
              summary="Upload files for a task")
-def upload_file_for_task(
+async def upload_file_for_task(
     task_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: get_current_user = Depends(),
 ):
     """
     Upload a file for a specific task.
     """
     try:
-        status, message, data = upload_file(db=db, task_id=task_id, file=file, current_user=current_user)
+        status, message, data = await upload_file(db=db, task_id=task_id, file=file, current_user=current_user)
         return ResponseData(status=status, message=message, data=data)
     except Exception as e:
         return ResponseData(
             status=False,
             message=msg["unexp_error"],
             data={},
-        )
\ No newline at end of file
+        )
+
+# Download a document
+@router.get("/tasks/documents/{document_id}",
+            tags=["Tasks"],
+            summary="Download a document of a task")
+async def download_document(
+    document_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: get_current_user = Depends(),
+):
+    """
+    Download a document of a task visible to the current user:
+    - Supports a single HTTP Range and If-None-Match with the returned ETag
+    - Documents never change, the response may be cached indefinitely
+    """
+    try:
+        status, message, document = await get_document(db, current_user, document_id)
+        if not status:
+            return ResponseData(status=False, message=message, data={})
+        response = await document_response(request, document.document_path, document.file_name, document.content_hash)
+        if response is None:
+            return ResponseData(status=False, message=msg["doc_not_found"], data={})
+        return response
+    except Exception as e:
+        return ResponseData(
+            status=False,
+            message=msg["unexp_error"],
+            data={},
+        )
+
+# Download the thumbnail of a document
+@router.get("/tasks/documents/{document_id}/thumbnail",
+            tags=["Tasks"],
+            summary="Download the thumbnail of a document of a task")
+async def download_thumbnail(
+    document_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: get_current_user = Depends(),
+):
+    """
+    Download the thumbnail of an image document of a task visible to the current user,
+    cached like the document itself.
+    """
+    try:
+        status, message, document = await get_document(db, current_user, document_id)
+        if not status:
+            return ResponseData(status=False, message=message, data={})
+        if not document.thumbnail_path:
+            return ResponseData(status=False, message=msg["doc_not_found"], data={})
+        response = await document_response(request, document.thumbnail_path)
+        if response is None:
+            return ResponseData(status=False, message=msg["doc_not_found"], data={})
+        return response
+    except Exception as e:
+        return ResponseData(
+            status=False,
+            message=msg["unexp_error"],
+            data={},
+        )
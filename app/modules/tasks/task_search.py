@@ -0,0 +1,59 @@
+# app/modules/tasks/task_search.py
+
+from typing import Optional
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tasks import Task
+from app.auth.auth import get_current_user
+from app.config.database import msg
+from app.data.data_class import settings
+from app.dto.tasks_schema import TaskOut, TaskSearchOut
+from app.modules.tasks.task_services import scope_tasks
+from utils import encode_cursor, decode_cursor
+
+# SEARCH tasks by title and description
+async def search_tasks(
+        db: AsyncSession,
+        current_user: get_current_user,
+        q: str,
+        limit: int = settings.default_page_size,
+        cursor: Optional[str] = None,
+    ):
+    """
+    Full-text search over the visible tasks, best matches first.
+
+    Backed by the FULLTEXT index on (title, description) in natural language mode.
+    Pages are keyset paginated on (score, id), the cursor carries the score of the
+    last returned task.
+
+    The scores are not stable between pages: InnoDB computes them from the term
+    statistics of the whole index when each page is read, so tasks written in
+    between shift them and a task may be returned twice or skipped across pages.
+    Each page is ranked consistently; a stable ranking is one page of up to
+    settings.max_page_size tasks.
+
+    Returns:
+    - tuple: status, message, the matching tasks with their score and the next cursor.
+    """
+    score = mysql.match(Task.title, Task.description, against=q)
+    query = scope_tasks(
+        select(Task, score.label("score")).options(selectinload(Task.documents)).filter(score),
+        current_user,
+    )
+    if cursor:
+        try:
+            last_score, last_id = decode_cursor(cursor)
+            last_score, last_id = float(last_score), int(last_id)
+        except (TypeError, ValueError):
+            return False, msg["inv_cursor"], {}, None
+        query = query.filter(or_(score < last_score, and_(score == last_score, Task.id > last_id)))
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.order_by(score.desc(), Task.id).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].score, rows[-1].Task.id)
+    tasks_data = [TaskSearchOut(**dict(TaskOut.model_validate(task)), score=task_score) for task, task_score in rows]
+    return True, msg["tasks_avl"], tasks_data, next_cursor
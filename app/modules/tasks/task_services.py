@@ -1,104 +1,142 @@
 # app/modules/tasks/service.py
 
+import csv
+import io
+import json
 import os
 import sys
 
 sys.path.append("..")
 from fastapi import Depends,UploadFile
-from typing import List, Optional
-from datetime import date
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
-from app.models.tasks import Task, TaskHistory, TaskDocument
-from app.dto.tasks_schema import CreateTask, DocumentResponseModel, ResponseData, CreateHistory
+from typing import AsyncIterator, List, Optional
+from datetime import date, datetime
+from sqlalchemy import and_, case, func, insert, or_, select, true, update
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tasks import Task, TaskHistory, TaskDocument, ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument
+from app.dto.tasks_schema import CreateTask, DocumentResponseModel, ResponseData, CreateHistory, BulkStatusUpdate, TaskOut, HistoryOut, HistoryEntryOut, document_url, thumbnail_url
 from app.auth.auth import get_current_user  
 from app.models.users import User 
 from app.permissions.roles import can_create
-from app.config.database import msg
+from app.config.database import msg, AsyncSessionLocal
 from app.data.data_class import settings
+from utils import encode_cursor, decode_cursor
+from app.storage.uploads import UploadTooLarge
+from app.storage.blobs import store_upload
+from app.modules.tasks.task_stats import stats_key, apply_stats_deltas
+from app.modules.tasks.task_reminders import reminders, COMPLETED_STATUS_ID
+from app.modules.tasks.task_versions import bump_versions, task_scopes
+from app.storage.thumbnails import thumbnailer
+from collections import Counter
 
-# Log History
-def log_task_history(db: Session, task_id: int, status_id: int, comments: Optional[str] = None):
+# Log History, the entry is committed together with the caller's change
+def log_task_history(db: AsyncSession, task_id: int, status_id: int, comments: Optional[str] = None):
     history_entry = TaskHistory(task_id=task_id, status_id=status_id, comments=comments)
     db.add(history_entry)
-    db.commit()
+
+# Restrict a Task (or ArchivedTask) select to the tasks visible to the current user's role
+def scope_tasks(query, current_user: get_current_user, model=Task):
+    if current_user.role_id == 2:
+        query = query.filter(or_(model.user_id == current_user.id, model.role_id == 3))
+    elif current_user.role_id == 3:
+        query = query.filter(model.user_id == current_user.id)
+    return query
+
+# Task and history models the list endpoints read, the archive tables only when asked for
+def task_sources(include_archived: bool = False) -> list:
+    sources = [(Task, TaskHistory)]
+    if include_archived:
+        sources.append((ArchivedTask, ArchivedTaskHistory))
+    return sources
+
+# SQL condition for the tasks the current user may update, same rules as update_task
+def task_edit_permission(current_user: get_current_user):
+    if current_user.role_id == 1:
+        return true()
+    if current_user.role_id == 2:
+        return or_(and_(Task.role_id.in_([2, 3]), Task.user_id == current_user.id), Task.role_id == 3)
+    return Task.user_id == current_user.id
+
+# Keyset pagination over (due_date, id), raises ValueError for a malformed cursor.
+# queries are (select, model) pairs; the pages of the hot and archived tasks are
+# merged on the same key, ids are kept when a task is archived so it stays unique.
+async def paginate_tasks(db: AsyncSession, queries: list, limit: int, cursor: Optional[str] = None):
+    if cursor:
+        last_due_date, last_id = decode_cursor(cursor)
+        last_due_date = datetime.fromisoformat(last_due_date)
+        last_id = int(last_id)
+    tasks = []
+    for query, model in queries:
+        if cursor:
+            query = query.filter(or_(
+                model.due_date > last_due_date,
+                and_(model.due_date == last_due_date, model.id > last_id),
+            ))
+        # Fetch one extra row to know whether another page exists
+        tasks.extend((await db.scalars(query.order_by(model.due_date, model.id).limit(limit + 1))).all())
+    if len(queries) > 1:
+        tasks = sorted(tasks, key=lambda task: (task.due_date, task.id))[:limit + 1]
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(tasks[-1].due_date, tasks[-1].id)
+    return tasks, next_cursor
 
 # LIST all Task for current user
-def get_tasks(db: Session, current_user: get_current_user):
-    tasks = (
-        db.query(Task)
-        .filter(Task.user_id == current_user.id)
-        .all()
-    )
-    return_tasks = []
-    for task in tasks:
-        document_paths = list_uploaded_documents_of_task_service(db, task.id)
-        task_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status_id": task.status_id,
-            "due_date": task.due_date,
-            "user_id": task.user_id,
-            "role_id": task.role_id,
-            "created_by_id": current_user.id,
-            "updated_by_id": current_user.id,
-            "created_at": task.created_at,
-            "document_path": document_paths.data.get("documents", []) if document_paths.status else None,
-        }
-        return_tasks.append(task_data)
-    data = return_tasks
-    return True,msg["tasks_avl"],data
+async def get_tasks(
+        db: AsyncSession,
+        current_user: get_current_user,
+        limit: int = settings.default_page_size,
+        cursor: Optional[str] = None,
+        include_archived: bool = False,
+    ):
+    # Task.documents is loaded with a single IN query for all the tasks
+    queries = [
+        (select(model).options(selectinload(model.documents)).filter(model.user_id == current_user.id), model)
+        for model, _ in task_sources(include_archived)
+    ]
+    try:
+        tasks, next_cursor = await paginate_tasks(db, queries, limit, cursor)
+    except (TypeError, ValueError):
+        return False, msg["inv_cursor"], {}, None
+    data = [TaskOut.model_validate(task) for task in tasks]
+    return True,msg["tasks_avl"],data,next_cursor
 
 # Filter all tasks with due_date and status_id
-def view_all_tasks(
-        db: Session, 
+async def view_all_tasks(
+        db: AsyncSession, 
         current_user: get_current_user, 
         status_id: Optional[int] = None, 
-        due_date: Optional[date] = None
+        due_date: Optional[date] = None,
+        limit: int = settings.default_page_size,
+        cursor: Optional[str] = None,
+        include_archived: bool = False,
     ):
     try:
-        query = db.query(Task)
-        if current_user.role_id == 2:
-            query = query.filter(or_(Task.user_id == current_user.id, Task.role_id == 3))
-        elif current_user.role_id == 3:
-            query = query.filter(Task.user_id == current_user.id)
-        if status_id:
-            query = query.filter(Task.status_id == status_id)
-            if status_id not in [1,2,3,4,5]:
-                return False, msg['inv_status'], {}
-        if due_date:
-            query = query.filter(Task.due_date == due_date)
-        tasks = query.all()
-        tasks_data = []
-        for task in tasks:
-            document_paths_response = list_uploaded_documents_of_task_service(db, task.id)
-            if document_paths_response.status:
-                document_paths = document_paths_response.data.get("documents", [])
-            else:
-                document_paths = []
-            task_data = {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status_id": task.status_id,
-                "due_date": task.due_date,
-                "user_id": task.user_id,
-                "role_id": task.role_id,
-                "created_by_id": task.created_by_id,
-                "updated_by_id": task.updated_by_id,
-                "created_at": task.created_at,
-                "document_path": document_paths
-            }
-            tasks_data.append(task_data)
-        return True, msg["tasks_avl"], tasks_data
+        if status_id and status_id not in [1,2,3,4,5]:
+            return False, msg['inv_status'], {}, None
+        queries = []
+        for model, _ in task_sources(include_archived):
+            query = scope_tasks(select(model).options(selectinload(model.documents)), current_user, model)
+            if status_id:
+                query = query.filter(model.status_id == status_id)
+            if due_date:
+                query = query.filter(model.due_date == due_date)
+            queries.append((query, model))
+        try:
+            tasks, next_cursor = await paginate_tasks(db, queries, limit, cursor)
+        except (TypeError, ValueError):
+            return False, msg["inv_cursor"], {}, None
+        tasks_data = [TaskOut.model_validate(task) for task in tasks]
+        return True, msg["tasks_avl"], tasks_data, next_cursor
     except Exception as e:
         print(e)
-        return False, msg["unexp_error"], {}
+        return False, msg["unexp_error"], {}, None
 
 # CREATE tasks with optional file upload
-def create_task(
-    db: Session,
+async def create_task(
+    db: AsyncSession,
     task: CreateTask,
     status_id: int,
     current_user: get_current_user,
@@ -107,7 +145,7 @@ def create_task(
     """Create a task with optional file upload."""
     assigned_user = None
     if task.user_id is not None:
-        assigned_user = db.query(User).filter(User.id == task.user_id).first()
+        assigned_user = await db.scalar(select(User).filter(User.id == task.user_id))
         if not assigned_user:
             return msg["invalid_user"]
     user_id_value = assigned_user.id if assigned_user else None
@@ -121,51 +159,215 @@ def create_task(
         user_id=user_id_value,
         role_id=assigned_user.role_id if assigned_user else None,
         status_id=status_id_value,
+        documents=[],
     )
     if not can_create(current_user.role_id, db_task.role_id):
         return False, msg["enough_perm"], {}
-    document_path = None
     if file:
-        upload_dir = "static/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = f"{upload_dir}/{current_user.id}_{file.filename}"
-        with open(file_path, 'wb') as f:
-            f.write(file.file.read())
-        db_file = TaskDocument(task=db_task, document_path=file_path, created_by_id=current_user.id)
+        # The document row is only added once the file is fully on disk
+        try:
+            file_path, content_hash = await store_upload(db, file)
+        except UploadTooLarge:
+            return False, msg["file_too_large"], {}
+        db_file = TaskDocument(
+            task=db_task,
+            document_path=file_path,
+            content_hash=content_hash,
+            file_name=os.path.basename(file.filename),
+            created_by_id=current_user.id,
+        )
         db.add(db_file)
-        base_url = settings.base_url
-        document_path = f"static/uploads/{current_user.id}_{file.filename}"
-        full_url = f"{base_url}/{document_path}"
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
-    return_task = {
-        "id": db_task.id,  
-        "title": db_task.title,
-        "description": db_task.description,
-        "status_id": db_task.status_id,
-        "due_date": db_task.due_date,
-        "user_id": db_task.user_id,
-        "role_id": db_task.role_id,
-        "created_by_id": str(current_user.id),
-        "updated_by_id": str(current_user.id),
-        "created_at": db_task.created_at,
-        "document_path": document_path
+    await apply_stats_deltas(db, Counter({stats_key(db_task.status_id, db_task.user_id, db_task.role_id): 1}))
+    await bump_versions(db, task_scopes([(db_task.user_id, db_task.role_id)]))
+    await db.commit()
+    # Only the server default is reloaded, the documents collection stays loaded
+    await db.refresh(db_task, ["created_at"])
+    if db_task.status_id != COMPLETED_STATUS_ID:
+        reminders.schedule(db_task.id, db_task.due_date)
+    if file:
+        thumbnailer.submit(file_path, content_hash)
+    return True, msg['task_created'], TaskOut.model_validate(db_task)
+
+# A malformed NDJSON line becomes an invalid item instead of failing the whole stream
+def _parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+# Parse a bulk request body into task items, NDJSON is read line by line as it arrives
+async def iter_bulk_items(request) -> AsyncIterator:
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        pending = b""
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_ndjson_line(line)
+        if pending.strip():
+            yield _parse_ndjson_line(pending)
+    else:
+        items = json.loads(await request.body())
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array of tasks")
+        for item in items:
+            yield item
+
+# CREATE many tasks in batches
+async def bulk_create_tasks(db: AsyncSession, current_user: get_current_user, items: AsyncIterator):
+    """
+    Create tasks from an async iterator of CreateTask items.
+
+    Items are processed in batches of settings.bulk_batch_size: the assignees of a
+    batch are resolved with one query, every item is checked with can_create, the
+    valid ones are inserted with one executemany and the batch is committed. A batch
+    the database rejects is rolled back and its items reported as failed, the other
+    batches are still processed.
+
+    Returns:
+    - list: One result per item, in input order, with its index, status and message.
+    """
+    results = []
+    batch = []
+
+    async def flush(batch):
+        tasks = []
+        for index, item in batch:
+            try:
+                tasks.append((index, CreateTask.model_validate(item)))
+            except Exception:
+                results.append({"index": index, "status": False, "message": msg["inv_task_item"]})
+        user_ids = {task.user_id for _, task in tasks}
+        assignees = dict((await db.execute(select(User.id, User.role_id).filter(User.id.in_(user_ids)))).all()) if user_ids else {}
+        rows, accepted = [], []
+        for index, task in tasks:
+            if task.user_id not in assignees:
+                results.append({"index": index, "status": False, "message": msg["invalid_user"]})
+            elif task.status_id not in [1,2,3,4,5]:
+                results.append({"index": index, "status": False, "message": msg["inv_status"]})
+            elif not can_create(current_user.role_id, assignees[task.user_id]):
+                results.append({"index": index, "status": False, "message": msg["enough_perm"]})
+            else:
+                rows.append({
+                    "title": task.title,
+                    "description": task.description,
+                    "due_date": task.due_date,
+                    "status_id": task.status_id,
+                    "user_id": task.user_id,
+                    "role_id": assignees[task.user_id],
+                    "created_by_id": current_user.id,
+                    "updated_by_id": current_user.id,
+                })
+                accepted.append(index)
+        if rows:
+            try:
+                # One executemany, sent as a multi-row INSERT by the driver
+                await db.execute(insert(Task), rows)
+                await apply_stats_deltas(db, Counter(stats_key(row["status_id"], row["user_id"], row["role_id"]) for row in rows))
+                await bump_versions(db, task_scopes((row["user_id"], row["role_id"]) for row in rows))
+                await db.commit()
+            except SQLAlchemyError:
+                # Only this batch fails, the batches before it stay committed
+                await db.rollback()
+                for index in accepted:
+                    results.append({"index": index, "status": False, "message": msg["bulk_batch_failed"]})
+                return
+            # The inserted ids are not known, the reminder window is reloaded instead
+            reminders.reload(row["due_date"] for row in rows if row["status_id"] != COMPLETED_STATUS_ID)
+            for index in accepted:
+                results.append({"index": index, "status": True, "message": msg["task_created"]})
+
+    index = 0
+    async for item in items:
+        batch.append((index, item))
+        index += 1
+        if len(batch) >= settings.bulk_batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    results.sort(key=lambda result: result["index"])
+    return results
+
+# Update the status of many tasks
+async def bulk_update_task_status(db: AsyncSession, current_user: get_current_user, bulk: BulkStatusUpdate):
+    """
+    Move many tasks to one status in a single transaction.
+
+    Permissions are evaluated in SQL while the rows are locked, the permitted tasks
+    get one set-based UPDATE per batch, their TaskHistory rows one executemany
+    INSERT, and everything is committed once. The summary counters and list versions
+    are written once after the last batch, so the task rows are always locked before
+    them, in the same order as update_task.
+
+    Returns:
+    - tuple: status, message and the updated, not found and forbidden task ids.
+    """
+    if bulk.status_id not in [1,2,3,4,5]:
+        return False, msg["inv_status"], {}
+    task_ids = list(dict.fromkeys(bulk.task_ids))
+    updated, forbidden, found, due_dates = [], [], set(), {}
+    deltas, assignees = Counter(), set()
+    permission = task_edit_permission(current_user)
+    for start in range(0, len(task_ids), settings.bulk_batch_size):
+        batch = task_ids[start:start + settings.bulk_batch_size]
+        rows = (await db.execute(
+            select(Task.id, case((permission, True), else_=False), Task.status_id, Task.user_id, Task.role_id, Task.due_date)
+            .filter(Task.id.in_(batch))
+            .with_for_update()
+        )).all()
+        allowed = [row[0] for row in rows if row[1]]
+        forbidden.extend(row[0] for row in rows if not row[1])
+        found.update(row[0] for row in rows)
+        for _, permitted, old_status_id, user_id, role_id, _ in rows:
+            if permitted and old_status_id != bulk.status_id:
+                deltas[stats_key(old_status_id, user_id, role_id)] -= 1
+                deltas[stats_key(bulk.status_id, user_id, role_id)] += 1
+        if not allowed:
+            continue
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(allowed))
+            .values(status_id=bulk.status_id, updated_by_id=current_user.id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(insert(TaskHistory), [
+            {"task_id": task_id, "status_id": bulk.status_id, "comments": bulk.comments}
+            for task_id in allowed
+        ])
+        assignees.update((row[3], row[4]) for row in rows if row[1])
+        updated.extend(allowed)
+        due_dates.update((row[0], row[5]) for row in rows if row[1])
+    if updated:
+        await apply_stats_deltas(db, deltas)
+        await bump_versions(db, task_scopes(assignees))
+    await db.commit()
+    for task_id, due_date in due_dates.items():
+        if bulk.status_id == COMPLETED_STATUS_ID:
+            reminders.cancel(task_id)
+        else:
+            reminders.schedule(task_id, due_date)
+    return True, msg["update_task"], {
+        "updated": updated,
+        "not_found": [task_id for task_id in task_ids if task_id not in found],
+        "forbidden": forbidden,
     }
-    if document_path:
-        return_task["document_path"] = full_url
-    return True, msg['task_created'], return_task
 
 # Update Task
-def update_task(
-    db: Session,
+async def update_task(
+    db: AsyncSession,
     task_id: int,
     task: CreateHistory,
     status_id: int,
     current_user: get_current_user = Depends(),
 ):
-    # Retrieve the task from the database
-    tasks = db.query(Task).filter(Task.id == task_id).first()
+    # Retrieve the task and its documents in one query, the task row locked until the
+    # commit so concurrent updates and the overdue sweep apply their stats deltas in turn
+    tasks = (await db.scalars(
+        select(Task).options(joinedload(Task.documents)).filter(Task.id == task_id).with_for_update()
+    )).unique().first()
     if tasks is None:
         return False, msg["invalid_task"], {}
     # Check permissions based on user role
@@ -177,44 +379,43 @@ def update_task(
         (current_user.role_id == 3 and tasks.user_id == current_user.id)
     ):
         return False, msg["enough_perm"], {}
-    # Update task details
-    for key, value in task.model_dump(exclude_unset=True).items():
-        setattr(tasks, key, value)
+    # Update task details and log the history, flushed as one UPDATE and one
+    # INSERT and committed atomically. Nothing is reloaded afterwards: the
+    # response only uses values already known to the session.
+    if tasks.status_id != status_id:
+        await apply_stats_deltas(db, Counter({
+            stats_key(tasks.status_id, tasks.user_id, tasks.role_id): -1,
+            stats_key(status_id, tasks.user_id, tasks.role_id): 1,
+        }))
     tasks.status_id = status_id
-    db.commit()
-    # Log task history
+    tasks.updated_by_id = current_user.id
     log_task_history(db, tasks.id, tasks.status_id, task.comments)
-    db.refresh(tasks)
-    # Retrieve document paths for the task
-    document_paths = list_uploaded_documents_of_task_service(db, task_id)
-    # Construct return data
-    return True, msg["update_task"], {
-        "id": tasks.id,
-        "title": tasks.title,
-        "description": tasks.description,
-        "status_id": tasks.status_id,
-        "due_date": tasks.due_date,
-        "user_id": tasks.user_id,
-        "role_id": tasks.role_id,
-        "created_by_id": tasks.created_by_id,
-        "updated_by_id": current_user.id,
-        "created_at": tasks.created_at,
-        "document_path": document_paths.data.get("documents", []) if document_paths.status else None,
-    }
+    await bump_versions(db, task_scopes([(tasks.user_id, tasks.role_id)]))
+    await db.commit()
+    if status_id == COMPLETED_STATUS_ID:
+        reminders.cancel(tasks.id)
+    else:
+        reminders.schedule(tasks.id, tasks.due_date)
+    return True, msg["update_task"], TaskOut.model_validate(tasks)
 
 # Delete Task
-def delete_task(db: Session, current_user: get_current_user, task_id: int):
+async def delete_task(db: AsyncSession, current_user: get_current_user, task_id: int):
     try:
         # Retrieve the task to delete
-        task_to_delete = db.query(Task).filter(Task.id == task_id).first()
+        task_to_delete = await db.scalar(select(Task).filter(Task.id == task_id))
         if not task_to_delete:
             return False, msg["invalid_task"], {}
         # Check permissions based on user role
         if not can_create(current_user.role_id, task_to_delete.role_id):
             return False,msg['enough_perm'],{}
-        # Delete the task
-        db.delete(task_to_delete)
-        db.commit()
+        # Delete the task, its files are left to the upload garbage collector
+        await db.delete(task_to_delete)
+        await apply_stats_deltas(db, Counter({
+            stats_key(task_to_delete.status_id, task_to_delete.user_id, task_to_delete.role_id): -1,
+        }))
+        await bump_versions(db, task_scopes([(task_to_delete.user_id, task_to_delete.role_id)]))
+        await db.commit()
+        reminders.cancel(task_id)
         # Construct return data
         return True, msg["task_del"], {
             "id": task_to_delete.id,
@@ -232,47 +433,131 @@ def delete_task(db: Session, current_user: get_current_user, task_id: int):
         return False, msg["invalid_task"], {}
 
 # GET task history
-def get_task_history(db: Session, current_user: get_current_user, task_ids: Optional[List[int]] = None):
+async def get_task_history(
+        db: AsyncSession,
+        current_user: get_current_user,
+        task_ids: Optional[List[int]] = None,
+        status_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        limit: int = settings.default_page_size,
+        cursor: Optional[str] = None,
+        history_limit: int = settings.default_page_size,
+        history_cursor: Optional[str] = None,
+        include_archived: bool = False,
+    ):
+    """
+    Page through the visible tasks (keyset on id) with at most history_limit
+    history entries each, filtered on status_id and the created_at range.
+
+    The history of the whole page is read with one windowed query served by the
+    (task_id, created_at) index. history_cursor continues the history of a single
+    task and is only accepted together with exactly one task id. include_archived
+    also pages through the archive tables, with one more windowed query.
+
+    Returns:
+    - tuple: status, message, the task histories and the cursor of the next task page.
+    """
     try:
         if current_user.role_id not in [1,2,3]:
-            return False, msg["invalid_role"], {}
-        # Filter tasks based on user's role
-        query = db.query(Task)
-        if current_user.role_id == 2:
-            query = query.filter(or_(Task.user_id == current_user.id, Task.role_id == 3))
-        elif current_user.role_id == 3:
-            query = query.filter(Task.user_id == current_user.id)
-        if task_ids:
-            query = query.filter(Task.id.in_(task_ids))
-        tasks = query.all()
+            return False, msg["invalid_role"], {}, None
+        if status_id and status_id not in [1,2,3,4,5]:
+            return False, msg["inv_status"], {}, None
+        try:
+            last_id = None
+            if cursor:
+                last_id, = decode_cursor(cursor)
+                last_id = int(last_id)
+            last_history = None
+            if history_cursor:
+                if not task_ids or len(set(task_ids)) != 1:
+                    raise ValueError("history_cursor needs exactly one task id")
+                last_created_at, last_history_id = decode_cursor(history_cursor)
+                last_history = (datetime.fromisoformat(last_created_at), int(last_history_id))
+        except (TypeError, ValueError):
+            return False, msg["inv_cursor"], {}, None
+        # History filters, shared by the task selection and the history query
+        def history_filters(history_model) -> list:
+            filters = []
+            if status_id:
+                filters.append(history_model.status_id == status_id)
+            if created_from:
+                filters.append(history_model.created_at >= created_from)
+            if created_to:
+                filters.append(history_model.created_at < created_to)
+            return filters
+        # Fetch one extra task per source to know whether another page exists,
+        # the hot and archived pages are merged on id
+        tasks = []
+        for task_model, history_model in task_sources(include_archived):
+            filters = history_filters(history_model)
+            # Filter tasks based on user's role
+            query = scope_tasks(select(task_model.id, task_model.due_date), current_user, task_model)
+            if task_ids:
+                query = query.filter(task_model.id.in_(task_ids))
+            if filters:
+                query = query.filter(task_model.history.any(and_(*filters)))
+            if last_id is not None:
+                query = query.filter(task_model.id > last_id)
+            rows = await db.execute(query.order_by(task_model.id).limit(limit + 1))
+            tasks.extend((row, history_model) for row in rows)
+        tasks = sorted(tasks, key=lambda task: task[0].id)[:limit + 1]
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1][0].id)
+        # First history_limit + 1 entries of every task of the page, one query per source
+        histories = {task.id: [] for task, _ in tasks}
+        for history_model in {history_model for _, history_model in tasks}:
+            filters = history_filters(history_model)
+            if last_history:
+                last_created_at, last_history_id = last_history
+                filters.append(or_(
+                    history_model.created_at > last_created_at,
+                    and_(history_model.created_at == last_created_at, history_model.id > last_history_id),
+                ))
+            position = func.row_number().over(
+                partition_by=history_model.task_id,
+                order_by=(history_model.created_at, history_model.id),
+            ).label("position")
+            ranked = (
+                select(history_model.id, history_model.task_id, history_model.comments, history_model.status_id, history_model.created_at, position)
+                .filter(history_model.task_id.in_([task.id for task, model in tasks if model is history_model]), *filters)
+                .subquery()
+            )
+            rows = await db.execute(
+                select(ranked)
+                .filter(ranked.c.position <= history_limit + 1)
+                .order_by(ranked.c.task_id, ranked.c.position)
+            )
+            for row in rows:
+                histories[row.task_id].append(row)
         task_histories = []
-        for task in tasks:
-            task_history = {
-                "task_id": task.id,
-                # "created_at": task.created_at,
-                "due_date": task.due_date,
-                "history": [
-                    {
-                        "comments": history.comments,
-                        "status_id": history.status_id,
-                        "created_at": history.created_at,
-                    }
-                    for history in task.history
-                ],
-            }
-            task_histories.append(task_history)
-        return True, msg["task_his"], task_histories
+        for task, history_model in tasks:
+            entries = histories[task.id]
+            next_history_cursor = None
+            if len(entries) > history_limit:
+                entries = entries[:history_limit]
+                next_history_cursor = encode_cursor(entries[-1].created_at, entries[-1].id)
+            task_histories.append(HistoryOut(
+                task_id=task.id,
+                due_date=task.due_date,
+                history=[HistoryEntryOut.model_validate(history) for history in entries],
+                next_history_cursor=next_history_cursor,
+                archived=history_model is ArchivedTaskHistory,
+            ))
+        return True, msg["task_his"], task_histories, next_cursor
     except Exception as e:
-        return False, msg["unexp_error"], {}
+        return False, msg["unexp_error"], {}, None
 
 # Upload file for a task
-def upload_file(db: Session, task_id: int, file: UploadFile, current_user: get_current_user):
+async def upload_file(db: AsyncSession, task_id: int, file: UploadFile, current_user: get_current_user):
     try:
         # Check if a file is provided
         if not file:
             return False, msg["random_key_11"], {}
         # Retrieve the task
-        task = db.query(Task).filter(Task.id == task_id).first()
+        task = await db.scalar(select(Task).filter(Task.id == task_id))
         if not can_create(current_user.role_id, task.role_id):
             return False, msg["enough_perm"], {}
         if not task:
@@ -280,25 +565,25 @@ def upload_file(db: Session, task_id: int, file: UploadFile, current_user: get_c
         # Check if the current user can create a document for the task
         if not can_create(current_user.role_id, task.role_id):
             return False, msg["enough_perm"], {}
-        # Create the upload directory if it doesn't exist
-        upload_dir = "static/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        # Save the file
-        file_contents = file.file.read()
-        file_path = os.path.join(upload_dir, f"{task_id}_{file.filename}")
-        with open(file_path, 'wb') as f:
-            f.write(file_contents)
+        # Save the file, the document row is only added once it is fully on disk
+        try:
+            file_path, content_hash = await store_upload(db, file)
+        except UploadTooLarge:
+            return False, msg["file_too_large"], {}
         # Save file path in the database
         db_file = TaskDocument(
             task_id=task_id,
             document_path=file_path,
+            content_hash=content_hash,
+            file_name=os.path.basename(file.filename),
             created_by_id=current_user.id
         )
         db.add(db_file)
-        db.commit()
-        # Construct the full URL path 
-        base_url = settings.base_url
-        full_url = f"{base_url}/{file_path}"
+        await bump_versions(db, task_scopes([(task.user_id, task.role_id)]))
+        await db.commit()
+        thumbnailer.submit(file_path, content_hash)
+        # Downloaded through the permission-checked endpoint
+        full_url = document_url(db_file.id)
         # Construct the response data
         response_data = {
             "document_id": db_file.id,
@@ -310,17 +595,39 @@ def upload_file(db: Session, task_id: int, file: UploadFile, current_user: get_c
     except Exception as e:
         return False, msg["unexp_error"], {}
     finally:
-        file.file.close()
+        await file.close()
     
+# GET a document of a task visible to the current user
+async def get_document(db: AsyncSession, current_user: get_current_user, document_id: int):
+    document = await db.scalar(
+        scope_tasks(select(TaskDocument).join(Task, TaskDocument.task_id == Task.id), current_user)
+        .filter(TaskDocument.id == document_id)
+    )
+    if document is None:
+        # Documents keep their id when their task is archived
+        document = await db.scalar(
+            scope_tasks(
+                select(ArchivedTaskDocument).join(ArchivedTask, ArchivedTaskDocument.task_id == ArchivedTask.id),
+                current_user,
+                ArchivedTask,
+            )
+            .filter(ArchivedTaskDocument.id == document_id)
+        )
+    if document is None:
+        return False, msg["doc_not_found"], None
+    return True, msg["retrived_docs"], document
+
 # GET the list of uploaded documents
-def list_uploaded_documents_of_task_service(db: Session, task_id: int) -> ResponseData:
-    documents = db.query(TaskDocument).filter(TaskDocument.task_id == task_id).all()
-    base_url = settings.base_url
+async def list_uploaded_documents_of_task_service(db: AsyncSession, task_id: int) -> ResponseData:
+    documents = (await db.scalars(select(TaskDocument).filter(TaskDocument.task_id == task_id))).all()
     document_list = []
     for document in documents:
-        full_url = f"{base_url}/{document.document_path}"
         document_list.append(
-            DocumentResponseModel(task_id=document.task_id, document_path=full_url)
+            DocumentResponseModel(
+                task_id=document.task_id,
+                document_path=document_url(document.id),
+                thumbnail_path=thumbnail_url(document.id) if document.thumbnail_path else None,
+            )
         )
     data = {
         "task_id": task_id,
@@ -330,4 +637,87 @@ def list_uploaded_documents_of_task_service(db: Session, task_id: int) -> Respon
         status=True,
         message=msg["retrived_docs"],
         data=data,
-    )
\ No newline at end of file
+    )
+
+# Columns of a task written by the export, in CSV column order
+EXPORT_COLUMNS = [
+    "id", "title", "description", "status_id", "due_date", "user_id", "role_id",
+    "created_by_id", "updated_by_id", "created_at", "updated_at",
+]
+
+# Serialize dates and datetimes of an exported row as ISO 8601
+def _export_json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+# Build one export row with the task's document URLs and history
+def _export_row(task: Task) -> dict:
+    row = {column: getattr(task, column) for column in EXPORT_COLUMNS}
+    row["document_path"] = [document_url(document.id) for document in task.documents]
+    row["history"] = [
+        {
+            "comments": history.comments,
+            "status_id": history.status_id,
+            "created_at": history.created_at,
+        }
+        for history in task.history
+    ]
+    return row
+
+# Flatten an export row for CSV: history as a JSON column, document URLs space separated
+def _export_csv_row(task: Task) -> list:
+    row = _export_row(task)
+    values = [row[column].isoformat() if isinstance(row[column], (date, datetime)) else row[column] for column in EXPORT_COLUMNS]
+    return values + [" ".join(row["document_path"]), json.dumps(row["history"], default=_export_json_default)]
+
+# Render rows as a CSV text chunk
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+# EXPORT all visible tasks as NDJSON or CSV chunks
+async def export_tasks(
+        current_user: get_current_user,
+        status_id: Optional[int] = None,
+        due_date: Optional[date] = None,
+        export_format: str = "ndjson",
+    ):
+    """
+    Async generator yielding the export one batch of tasks at a time.
+
+    Tasks are paged with keyset on id, one bounded query per batch, and the documents
+    and history of each batch are loaded with one IN query each once the batch is
+    fully read. A server-side cursor cannot be used: the IN queries would run on the
+    same connection while it is open, and the MySQL drivers discard the rest of an
+    unbuffered result on the next command. The identity map is cleared between
+    batches, so memory stays bounded by the batch size whatever the number of
+    exported tasks. The session is owned by the generator because the response
+    outlives the request's session.
+    """
+    query = scope_tasks(select(Task), current_user)
+    if status_id:
+        query = query.filter(Task.status_id == status_id)
+    if due_date:
+        query = query.filter(Task.due_date == due_date)
+    query = query.options(selectinload(Task.documents), selectinload(Task.history)).order_by(Task.id)
+    batch_size = settings.export_batch_size
+    async with AsyncSessionLocal() as db:
+        if export_format == "csv":
+            yield _csv_chunk([EXPORT_COLUMNS + ["document_path", "history"]])
+        last_id = None
+        while True:
+            batch = query if last_id is None else query.filter(Task.id > last_id)
+            tasks = (await db.scalars(batch.limit(batch_size))).all()
+            if not tasks:
+                break
+            if export_format == "csv":
+                chunk = _csv_chunk(_export_csv_row(task) for task in tasks)
+            else:
+                chunk = "".join(json.dumps(_export_row(task), default=_export_json_default) + "\n" for task in tasks)
+            yield chunk
+            if len(tasks) < batch_size:
+                break
+            last_id = tasks[-1].id
+            db.expunge_all()
@@ -0,0 +1,106 @@
+# app/modules/tasks/task_stats.py
+
+from collections import Counter
+from typing import Optional
+from sqlalchemy import delete, func, insert, select, or_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tasks import Task, TaskStats
+from app.auth.auth import get_current_user
+from app.config.database import msg
+
+# Dialect specific INSERT supporting an upsert
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Summary row a task is counted in
+def stats_key(status_id: int, user_id: Optional[int], role_id: int) -> tuple:
+    return (status_id, user_id or 0, role_id)
+
+# Summary rows of a Counter of deltas, zero deltas skipped
+def stats_rows(deltas: Counter) -> list:
+    return [
+        {"status_id": status_id, "user_id": user_id, "role_id": role_id, "task_count": delta}
+        for (status_id, user_id, role_id), delta in deltas.items() if delta
+    ]
+
+# INSERT adding task_count to the existing summary row
+def stats_upsert(dialect: str):
+    if dialect == "mysql":
+        statement = mysql.insert(TaskStats)
+        return statement.on_duplicate_key_update(task_count=TaskStats.task_count + statement.inserted.task_count)
+    statement = UPSERT_INSERTS[dialect](TaskStats)
+    return statement.on_conflict_do_update(
+        index_elements=[TaskStats.status_id, TaskStats.user_id, TaskStats.role_id],
+        set_={"task_count": TaskStats.task_count + statement.excluded.task_count},
+    )
+
+async def apply_stats_deltas(db: AsyncSession, deltas: Counter):
+    """
+    Add the given count deltas to the summary rows with one upsert.
+
+    Called inside the transaction of the task write, so the counters commit or
+    roll back together with it.
+
+    Parameters:
+    - deltas (Counter): Count change per stats_key.
+    """
+    rows = stats_rows(deltas)
+    if rows:
+        await db.execute(stats_upsert(db.get_bind().dialect.name), rows)
+
+async def subtract_task_stats(db: AsyncSession, condition):
+    """
+    Remove from the summary the tasks matching a condition, before they are deleted in bulk.
+    """
+    user_id = func.coalesce(Task.user_id, 0)
+    rows = await db.execute(
+        select(Task.status_id, user_id, Task.role_id, func.count())
+        .filter(condition)
+        .group_by(Task.status_id, user_id, Task.role_id)
+    )
+    await apply_stats_deltas(db, Counter({(status_id, user, role_id): -count for status_id, user, role_id, count in rows}))
+
+# GET task counts visible to the current user
+async def get_task_stats(db: AsyncSession, current_user: get_current_user):
+    """
+    Task counts per status, assignee and role, read from the summary table.
+
+    The cost depends on the number of (status, assignee, role) combinations visible
+    to the user, never on the number of tasks. Visibility follows view_all_tasks.
+    """
+    query = select(TaskStats).filter(TaskStats.task_count > 0)
+    if current_user.role_id == 2:
+        query = query.filter(or_(TaskStats.user_id == current_user.id, TaskStats.role_id == 3))
+    elif current_user.role_id == 3:
+        query = query.filter(TaskStats.user_id == current_user.id)
+    by_status, by_assignee, by_role = Counter(), Counter(), Counter()
+    for row in await db.scalars(query):
+        by_status[row.status_id] += row.task_count
+        by_assignee[row.user_id] += row.task_count
+        by_role[row.role_id] += row.task_count
+    return True, msg["task_stats"], {
+        "total": sum(by_status.values()),
+        "by_status": dict(by_status),
+        "by_assignee": dict(by_assignee),
+        "by_role": dict(by_role),
+    }
+
+def rebuild_task_stats(connection: Connection):
+    """
+    Recompute the whole summary table from the tasks table, for recovery.
+    """
+    user_id = func.coalesce(Task.user_id, 0)
+    connection.execute(delete(TaskStats))
+    connection.execute(
+        insert(TaskStats).from_select(
+            ["status_id", "user_id", "role_id", "task_count"],
+            select(Task.status_id, user_id, Task.role_id, func.count()).group_by(Task.status_id, user_id, Task.role_id),
+        )
+    )
+
+# Rebuild the summary manually: python -m app.modules.tasks.task_stats
+if __name__ == "__main__":
+    from app.config.database import engine
+    with engine.begin() as connection:
+        rebuild_task_stats(connection)
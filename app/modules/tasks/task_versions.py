@@ -0,0 +1,70 @@
+# app/modules/tasks/task_versions.py
+
+from typing import Iterable, Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tasks import ListVersion
+from app.auth.auth import get_current_user
+from app.modules.tasks.task_stats import UPSERT_INSERTS
+
+# Scope of /user/all, bumped by every user write
+USERS_SCOPE = "users"
+
+# Scopes a task with this assignee and role is listed under
+def task_scopes(assignments: Iterable) -> set:
+    scopes = set()
+    for user_id, role_id in assignments:
+        if user_id is not None:
+            scopes.add(f"user:{user_id}")
+        scopes.add(f"role:{role_id}")
+    return scopes
+
+# Rows incrementing the version of each scope, sorted so concurrent writers lock them in the same order
+def version_rows(scopes: Iterable) -> list:
+    return [{"scope": scope, "version": 1} for scope in sorted(scopes)]
+
+# INSERT incrementing the version of existing scopes
+def version_upsert(dialect: str):
+    if dialect == "mysql":
+        statement = mysql.insert(ListVersion)
+        return statement.on_duplicate_key_update(version=ListVersion.version + 1)
+    statement = UPSERT_INSERTS[dialect](ListVersion)
+    return statement.on_conflict_do_update(
+        index_elements=[ListVersion.scope],
+        set_={"version": ListVersion.version + 1},
+    )
+
+async def bump_versions(db: AsyncSession, scopes: Iterable):
+    """
+    Increment the version of the given scopes, inside the transaction of the write
+    so the ETags of the lists change exactly when the write commits.
+    """
+    rows = version_rows(scopes)
+    if rows:
+        await db.execute(version_upsert(db.get_bind().dialect.name), rows)
+
+async def scope_version(db: AsyncSession, condition) -> int:
+    return await db.scalar(select(func.coalesce(func.sum(ListVersion.version), 0)).filter(condition))
+
+async def task_list_version(db: AsyncSession, current_user: get_current_user, own_tasks: bool = False) -> int:
+    """
+    Version of the tasks visible to the current user, following scope_tasks.
+
+    Every task write bumps the role scope of the task, so the sum over the role
+    scopes changes with any write. The versions only ever grow, so their sum
+    changes whenever one of them does.
+
+    Parameters:
+    - own_tasks (bool): Only the tasks assigned to the user, as in /tasks/me.
+    """
+    if own_tasks or current_user.role_id == 3:
+        condition = ListVersion.scope == f"user:{current_user.id}"
+    elif current_user.role_id == 2:
+        condition = ListVersion.scope.in_([f"user:{current_user.id}", "role:3"])
+    else:
+        condition = ListVersion.scope.like("role:%")
+    return await scope_version(db, condition)
+
+async def users_version(db: AsyncSession) -> int:
+    return await scope_version(db, ListVersion.scope == USERS_SCOPE)
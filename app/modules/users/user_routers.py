@@ -1,17 +1,23 @@
 # app.modules.users.routes.py
 
-from fastapi import BackgroundTasks, Depends, APIRouter, Form, Request
+from fastapi import BackgroundTasks, Depends, APIRouter, Form, Request, Query, Response
+from typing import Optional
 from app.models import User, Token
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.auth import get_current_user, otp_expire_time, generate_6_digit_otp, get_user_by_email
+from app.auth.hashing import hasher
+from app.auth.rate_limit import limit_forgot_password
 from app.permissions.roles import get_role_permissions, Role
-from app.config.database import get_db  
+from app.config.database import get_async_db
 from app.modules.users import user_services as db_crud
 from app.dto.users_schemas import UserSignUp, UserUpdate, RolesUpdate
 from app.email_notifications.notify import send_reset_password_mail
-from app.dto.tasks_schema import ResponseData
+from app.dto.tasks_schema import ResponseData, ModelResponse
 from fastapi.templating import Jinja2Templates
 from app.config.database import msg
+from app.data.data_class import settings
+from app.modules.tasks.task_versions import users_version
+from utils import make_etag, etag_matches
 
 # Load HTML templates
 templates = Jinja2Templates(directory='./app/templates')
@@ -21,18 +27,38 @@ router = APIRouter(prefix="")
 # LIST of all Users
 @router.get("/user/all",
             response_model=ResponseData, summary="Get all users", tags=["Users"])
-def get_users_route(
-              db: Session = Depends(get_db),
+async def get_users_route(
+              request: Request,
+              limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+              cursor: Optional[str] = None,
+              db: AsyncSession = Depends(get_async_db),
               current_user: get_current_user = Depends()):
     """
     Get list of all users.
+    - Pass the returned next_cursor as cursor to fetch the next page
+    - Send the returned ETag as If-None-Match to get a 304 while nothing changed
     """
     try:
-        users = db_crud.get_users(db, current_user)
+        # Read before the rows: a write committing in between only makes the next poll fetch again
+        version = await users_version(db)
+        etag = make_etag(version, current_user.id, current_user.role_id, str(request.url.query))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        users, next_cursor = await db_crud.get_users(db, current_user, limit, cursor)
+        return ModelResponse(
+            ResponseData(
+                status=True,
+                message=msg['lst_user'],
+                data={"users": users},
+                next_cursor=next_cursor
+            ),
+            headers={"ETag": etag},
+        )
+    except (TypeError, ValueError):
         return ResponseData(
-            status=True,
-            message=msg['lst_user'],
-            data={"users": users}
+            status=False,
+            message=msg['inv_cursor'],
+            data={}
         )
     except Exception:
         return ResponseData(
@@ -43,15 +69,15 @@ def get_users_route(
 
 # Function to read user by user_id
 @router.get("/user/view/{user_id}",response_model=ResponseData,summary="Get info of users", tags=["Users"])
-def get_user_by_user_id_route(user_id: int, 
-                        db: Session = Depends(get_db),
+async def get_user_by_user_id_route(user_id: int, 
+                        db: AsyncSession = Depends(get_async_db),
                         current_user: User = Depends(get_current_user),
                         ):
     """
     Get Information of users with user_id.
     """
     try:
-        user = db_crud.get_user(db, user_id, current_user)
+        user = await db_crud.get_user(db, user_id, current_user)
         if user:
             return ResponseData(
                 status=True,
@@ -74,7 +100,7 @@ def get_user_by_user_id_route(user_id: int,
 # Function to add a new user
 @router.post("/user/create",
              response_model=ResponseData, summary="Register users", tags=["Users"])
-async def create_user_route(user: UserSignUp, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_user_route(user: UserSignUp, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """
     Register a users:
     - Enter role_id as 1 or 2 or 3
@@ -94,9 +120,9 @@ async def create_user_route(user: UserSignUp, db: Session = Depends(get_db), cur
     
 # Function to update user information
 @router.put("/user/update/{user_id}", response_model=ResponseData, summary="Update users", tags=["Users"])
-def update_user_api(user_id: int, user: UserUpdate, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+async def update_user_api(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_async_db),current_user: User = Depends(get_current_user)):
     try:
-        status, message, data= db_crud.update_user(db, user_id, user, current_user)
+        status, message, data= await db_crud.update_user(db, user_id, user, current_user)
         return ResponseData(status=status, message=message, data=data)
     except Exception:
         response_data = ResponseData(
@@ -110,12 +136,12 @@ def update_user_api(user_id: int, user: UserUpdate, db: Session = Depends(get_db
 @router.delete("/user/delete/{user_id}",
                response_model=ResponseData,
                summary="Delete users", tags=["Users"])
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """
     Deletes a user.
     """
     try:
-        status, message, data=db_crud.delete_users(db, current_user, user_id)
+        status, message, data=await db_crud.delete_users(db, current_user, user_id)
         return ResponseData(status=status, message=message, data=data)
     except Exception:
         response_data = ResponseData(
@@ -129,7 +155,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
 @router.put("/roles/update/{user_id}",
             response_model=ResponseData,
             summary="Update users role", tags=["Roles"])
-def update_roles(user_id: int, user_update: RolesUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_roles(user_id: int, user_update: RolesUpdate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """
     Update the roles of the existing users:
     - Enter role_id as 1 or 2 or 3
@@ -138,7 +164,7 @@ def update_roles(user_id: int, user_update: RolesUpdate, db: Session = Depends(g
     - 3 = AGENT
     """
     try:
-        status, message, data = db_crud.update_roles(db, user_id, current_user, user_update)
+        status, message, data = await db_crud.update_roles(db, user_id, current_user, user_update)
         return ResponseData(status=status, message=message, data=data)
     except Exception:
         response_data = ResponseData(
@@ -151,7 +177,7 @@ def update_roles(user_id: int, user_update: RolesUpdate, db: Session = Depends(g
 # Function to LIST all user roles with permissions
 @router.get("/roles/all",
             response_model=ResponseData, summary="Get all user roles with permissions", tags=["Roles"])
-def get_user_roles(db: Session = Depends(get_db)):
+async def get_user_roles(db: AsyncSession = Depends(get_async_db)):
     """
     Returns all roles with their associated permissions.
     """
@@ -174,15 +200,27 @@ def get_user_roles(db: Session = Depends(get_db)):
         )
         return response_data
 
+# Password hashing pool counters
+@router.get("/user/hashing/stats", response_model=ResponseData, tags=["Users"], summary="Password hashing pool counters")
+async def password_hashing_stats(current_user: get_current_user = Depends()):
+    """
+    Pool size, calls in flight and queued, and queue wait of the password hashing pool of this worker (SUPERADMIN only)
+    """
+    if current_user.role_id != 1:
+        return ResponseData(status=False, message=msg["enough_perm"], data={})
+    return ResponseData(status=True, message=msg["hash_stats"], data=hasher.stats())
+
 # Forgot password
 @router.post("/forgot_password",
               summary="Forgotten Password", tags=["Forgot Password"])
-async def user_forgot_password(request: Request, user_email: str, db: Session = Depends(get_db)):
+async def user_forgot_password(request: Request, user_email: str, db: AsyncSession = Depends(get_async_db)):
     """
     Triggers forgot password mechanism for a user.
+    Rate limited per client address and per email, answering 429 with Retry-After.
     """
+    await limit_forgot_password(request, user_email)
     try:
-        user = get_user_by_email(db=db, user_email=user_email)
+        user = await get_user_by_email(db=db, user_email=user_email)
         if not user:
             response_data = ResponseData(
                 status=False,
@@ -201,7 +239,7 @@ async def user_forgot_password(request: Request, user_email: str, db: Session =
                 expiration_time=expiration_time  # Set expiration time
             )
             db.add(reset_token)
-            db.commit()
+            await db.commit()
             # Include OTP and expiration time in the response data
             response_data = ResponseData(
                 status=True,
@@ -223,11 +261,11 @@ async def user_forgot_password(request: Request, user_email: str, db: Session =
 
 # Function to reset user password for registered users
 @router.post("/reset_password", summary="Reset password for users", tags=["Forgot Password"])
-def user_reset_password(
+async def user_reset_password(
     request: Request,
     otp: str = Form(...),
     new_password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     background_tasks: BackgroundTasks = BackgroundTasks()
 ):
     """
@@ -235,7 +273,7 @@ def user_reset_password(
     """
     try:
         # Validate the OTP and retrieve the associated user_email
-        user_email = db_crud.validate_otp_and_get_email(db, otp)
+        user_email = await db_crud.validate_otp_and_get_email(db, otp)
         if not user_email:
             response_data = ResponseData(
             status=False,
@@ -244,11 +282,11 @@ def user_reset_password(
             )
             return response_data
         # Reset user password
-        success = db_crud.user_reset_password(db, user_email, new_password)
+        success = await db_crud.user_reset_password(db, user_email, new_password)
         if success:
             # Update token status and is_expired status
-            db_crud.update_token_status(db, otp_expire_time)
-            db_crud.update_password_change_status(db, otp)
+            await db_crud.update_token_status(db, otp_expire_time)
+            await db_crud.update_password_change_status(db, otp)
             background_tasks.add_task(db_crud.update_password_change_status, db, otp)
             background_tasks.add_task(db_crud.update_token_status, db, otp_expire_time)
             response_data = ResponseData(
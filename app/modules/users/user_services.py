@@ -2,49 +2,64 @@
 
 from datetime import datetime, timedelta
 import sys
-from sqlalchemy import or_
+from typing import Optional
+from sqlalchemy import delete, or_, select
 sys.path.append("..")
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.users import User, Token
-from app.dto.users_schemas import RolesUpdate, UserSignUp, UserUpdate
+from app.dto.users_schemas import RolesUpdate, UserSignUp, UserUpdate, UserOut
 from sqlalchemy.exc import IntegrityError
 from app.auth.auth import  get_current_user
+from app.auth.principals import principals
+from app.auth.hashing import hasher
 from app.permissions.roles import can_create
 from app.config.database import msg
-from utils import verify_password, get_password_hash
+from app.data.data_class import settings
+from utils import encode_cursor, decode_cursor
 from app.email_notifications.notify import send_registration_notification
+from app.models.tasks import Task, ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument
+from app.modules.tasks.task_stats import subtract_task_stats
+from app.modules.tasks.task_versions import USERS_SCOPE, bump_versions, task_scopes
 
 # Custom exception for duplicate error
 class DuplicateError(Exception):
     pass
 
-# LIST of all Users
-def get_users(db: Session, current_user: get_current_user):
-    query = db.query(User)
+# LIST of all Users, keyset paginated on id (raises ValueError for a malformed cursor)
+async def get_users(db: AsyncSession, current_user: get_current_user, limit: int = settings.default_page_size, cursor: Optional[str] = None):
+    query = select(User)
     if current_user.role_id == 1:
         pass
     elif current_user.role_id == 2:
         query = query.filter(or_(User.id == current_user.id, User.role_id == 3))
     elif current_user.role_id == 3:
         query = query.filter(User.id == current_user.id)
-    users = query.all()
-
-    user_data = [user.to_dict() for user in users]
-    return user_data
+    if cursor:
+        last_id, = decode_cursor(cursor)
+        query = query.filter(User.id > int(last_id))
+    # Fetch one extra row to know whether another page exists
+    users = (await db.scalars(query.order_by(User.id).limit(limit + 1))).all()
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].id)
+
+    user_data = [UserOut.model_validate(user) for user in users]
+    return user_data, next_cursor
 
 # Function to read user by user_id
-def get_user(db: Session, user_id: int, current_user: get_current_user):
-    user= db.query(User).filter(User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int, current_user: get_current_user):
+    user= await db.scalar(select(User).filter(User.id == user_id))
     if current_user.id == user.id:
-        return user.to_dict()
+        return UserOut.model_validate(user)
     elif current_user.role_id == 3:
         return None
     if not can_create(current_user.role_id, user.role_id):
         return None
-    return user.to_dict()
+    return UserOut.model_validate(user)
 
 # Function to add a new user
-async def add_user(db: Session, user: UserSignUp, current_user: get_current_user):
+async def add_user(db: AsyncSession, user: UserSignUp, current_user: get_current_user):
     if not can_create(current_user.role_id, user.role_id):
         return False, msg["enough_perm"], {}
     password = user.password
@@ -54,24 +69,26 @@ async def add_user(db: Session, user: UserSignUp, current_user: get_current_user
         return False, msg['inv_roles'], {}
     user = User(
         email=user.email,
-        password=get_password_hash(password),
+        password=await hasher.hash(password),
         name=user.name,
         role_id=user.role_id,
         created_by=current_user.id 
     )
     try:
         db.add(user)
-        db.commit()
+        await bump_versions(db, [USERS_SCOPE])
+        await db.commit()
+        await db.refresh(user)
         # Send registration notification after successfully adding the user
         await send_registration_notification(password, user.email)
-        return True,msg['created_user'],user.to_dict()
+        return True,msg['created_user'],UserOut.model_validate(user)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         return False,msg['duplicate_email'],{}
 
 # Update User
-def update_user(db: Session, user_id: int, user: UserUpdate,current_user: get_current_user):
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def update_user(db: AsyncSession, user_id: int, user: UserUpdate,current_user: get_current_user):
+    db_user = await db.scalar(select(User).filter(User.id == user_id))
     if db_user is None:
         return False, msg["user_not"], {}
     # Check permissions based on user role_id
@@ -85,52 +102,81 @@ def update_user(db: Session, user_id: int, user: UserUpdate,current_user: get_cu
         return False, msg["enough_perm"], {}
     if db_user:
         # Check if the provided old password matches the stored password
-        if verify_password(user.old_password, db_user.password):
-            db_user.password = get_password_hash(user.new_password)
+        if await hasher.verify(user.old_password, db_user.password):
+            previous_email = db_user.email
+            db_user.password = await hasher.hash(user.new_password)
             for key, value in user.model_dump(exclude_unset=True).items():
                 setattr(db_user, key, value)
             db_user.updated_by = current_user.id
-            db.commit()
-            db.refresh(db_user)
-            return True,msg['user_upd'],db_user.to_dict()
+            await bump_versions(db, [USERS_SCOPE])
+            await db.commit()
+            principals.invalidate(previous_email)
+            await db.refresh(db_user)
+            return True,msg['user_upd'],UserOut.model_validate(db_user)
         else:
             False, msg['incorrect_pass'], {}
 
 
 # Function to delete a user
-def delete_users(db: Session,
+async def delete_users(db: AsyncSession,
                 current_user: get_current_user,
                 user_id: str):
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+    user_to_delete = await db.scalar(select(User).filter(User.id == user_id))
     if not user_to_delete:
         return False,msg['user_not'],{}
     # using a can_create function defined in app/permissions/roles.py
     if not can_create(current_user.role_id, user_to_delete.role_id):
         return False,msg['enough_perm'],{}
-    db.delete(user_to_delete)
-    db.commit()
-    return True,msg['user_del'],user_to_delete.to_dict()
+    # Tasks assigned to, created or updated by the user are removed by ON DELETE CASCADE
+    cascaded_tasks = or_(
+        Task.user_id == user_to_delete.id,
+        Task.created_by_id == user_to_delete.id,
+        Task.updated_by_id == user_to_delete.id,
+    )
+    await subtract_task_stats(db, cascaded_tasks)
+    assignments = (await db.execute(select(Task.user_id, Task.role_id).filter(cascaded_tasks).distinct())).all()
+    # The archive tables have no foreign keys, their rows are removed the same way here
+    archived_tasks = or_(
+        ArchivedTask.user_id == user_to_delete.id,
+        ArchivedTask.created_by_id == user_to_delete.id,
+        ArchivedTask.updated_by_id == user_to_delete.id,
+    )
+    assignments += (await db.execute(select(ArchivedTask.user_id, ArchivedTask.role_id).filter(archived_tasks).distinct())).all()
+    archived_ids = select(ArchivedTask.id).filter(archived_tasks)
+    await db.execute(delete(ArchivedTaskDocument).where(ArchivedTaskDocument.task_id.in_(archived_ids)))
+    await db.execute(delete(ArchivedTaskHistory).where(ArchivedTaskHistory.task_id.in_(archived_ids)))
+    await db.execute(delete(ArchivedTask).where(archived_tasks))
+    await bump_versions(db, task_scopes(assignments) | {USERS_SCOPE})
+    await db.delete(user_to_delete)
+    await db.commit()
+    principals.invalidate(user_to_delete.email)
+    return True,msg['user_del'],UserOut.model_validate(user_to_delete)
 
 
 # Function to update user roles
-def update_roles(db: Session, user_id: int, current_user: get_current_user, user_update: RolesUpdate):
+async def update_roles(db: AsyncSession, user_id: int, current_user: get_current_user, user_update: RolesUpdate):
     if current_user.role_id != 1:  # Assuming SUPERADMIN role_id is 1
         return False, msg['enough_perm'], {}
-    user_to_update = db.query(User).filter(User.id == user_id).first()
+    user_to_update = await db.scalar(select(User).filter(User.id == user_id))
     updated_user = user_update.model_dump(exclude_unset=True)
     for key, value in updated_user.items():
         setattr(user_to_update, key, value)
-    db.commit()
-    return True, msg['role_upd'], user_to_update.to_dict() 
+    await bump_versions(db, [USERS_SCOPE])
+    await db.commit()
+    principals.invalidate(user_to_update.email)
+    await db.refresh(user_to_update)
+    return True, msg['role_upd'], UserOut.model_validate(user_to_update) 
 
 
 # Function to reset user password for registered users
-def user_reset_password(db: Session, email: str, new_password: str):
+async def user_reset_password(db: AsyncSession, email: str, new_password: str):
     try:
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).filter(User.email == email))
         if user:
-            user.password = get_password_hash(new_password)
-            db.commit()
+            user.password = await hasher.hash(new_password)
+            await bump_versions(db, [USERS_SCOPE])
+            await db.commit()
+            principals.invalidate(email)
             return True
         else:
             return False
@@ -140,11 +186,11 @@ def user_reset_password(db: Session, email: str, new_password: str):
 
 
 # Function to validate OTP and get associated email
-def validate_otp_and_get_email(db: Session, otp: int):
+async def validate_otp_and_get_email(db: AsyncSession, otp: int):
     """
     Validate the OTP and return the associated user_email if valid.
     """
-    token = db.query(Token).filter_by(otp=otp, is_expired=False).first()
+    token = await db.scalar(select(Token).filter_by(otp=otp, is_expired=False))
     if token and not token.is_expired:
         if token.reset_password:
             # If reset_password is True, OTP is already used
@@ -154,28 +200,28 @@ def validate_otp_and_get_email(db: Session, otp: int):
 
 
 # Function to update the access_token status which was stored in Token model
-def update_token_status(db: Session, expire_minutes: int):
+async def update_token_status(db: AsyncSession, expire_minutes: int):
     # Find tokens that are not expired and created more than `expire_minutes` minutes ago
-    expired_tokens = db.query(Token).filter(
+    expired_tokens = (await db.scalars(select(Token).filter(
         Token.is_expired == False,
         Token.created_at < datetime.utcnow() - timedelta(minutes=expire_minutes)
-    ).all()
+    ))).all()
     # Update the is_expired status for the found tokens
     for token in expired_tokens:
         token.is_expired = True
-    db.commit()
+    await db.commit()
     # Return True if at least one token was expired, otherwise False
     return len(expired_tokens) > 0
 
 
 # Function to update the status of password 
-def update_password_change_status(db: Session, otp: int):
+async def update_password_change_status(db: AsyncSession, otp: int):
     """
     Update the reset_password column to True for the given temp_token.
     """
-    reset_token = db.query(Token).filter(Token.otp == otp).first()
+    reset_token = await db.scalar(select(Token).filter(Token.otp == otp))
     if reset_token and not reset_token.reset_password:
         reset_token.reset_password = True
-        db.commit()
+        await db.commit()
         return True
     return False
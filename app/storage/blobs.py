@@ -0,0 +1,63 @@
+# app/storage/blobs.py
+
+import hashlib
+import os
+from typing import Tuple
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.models.tasks import TaskDocument
+from app.storage.uploads import UPLOAD_DIR, remove_file, spool_upload
+
+# Content-addressed documents live under static/uploads/blobs/<first 2 hex digits>/<sha256><ext>
+BLOB_DIR = f"{UPLOAD_DIR}/blobs"
+# and the thumbnails of the images under static/uploads/thumbs/<first 2 hex digits>/<sha256>.jpg
+THUMB_DIR = f"{UPLOAD_DIR}/thumbs"
+
+def blob_path(content_hash: str, filename: str) -> str:
+    """
+    Path of the blob holding the given content, keeping the extension for content type detection.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    return f"{BLOB_DIR}/{content_hash[:2]}/{content_hash}{extension}"
+
+def thumbnail_path(content_hash: str) -> str:
+    return f"{THUMB_DIR}/{content_hash[:2]}/{content_hash}.jpg"
+
+async def store_upload(db: AsyncSession, file: UploadFile) -> Tuple[str, str]:
+    """
+    Store an upload in the blob store, deduplicated on its content.
+
+    The file is read once: spool_upload writes it to a temporary file under
+    BLOB_DIR while hashing it. A content already referenced by a TaskDocument
+    keeps its blob, touched so the upload garbage collector keeps it until the
+    new row is committed, and the temporary file is discarded. Otherwise the
+    temporary file is renamed to the blob path.
+
+    Returns:
+    - tuple: The document path to reference and the content hash.
+
+    Raises:
+    - UploadTooLarge: If the file exceeds the size limit.
+    """
+    digest = hashlib.sha256()
+    temp_path, _ = await spool_upload(file, BLOB_DIR, digest=digest)
+    try:
+        content_hash = digest.hexdigest()
+        existing_path = await db.scalar(
+            select(TaskDocument.document_path).filter(TaskDocument.content_hash == content_hash).limit(1)
+        )
+        if existing_path:
+            try:
+                await run_in_threadpool(os.utime, existing_path)
+                return existing_path, content_hash
+            except FileNotFoundError:
+                pass
+        document_path = blob_path(content_hash, file.filename)
+        await run_in_threadpool(os.makedirs, os.path.dirname(document_path), exist_ok=True)
+        await run_in_threadpool(os.replace, temp_path, document_path)
+        return document_path, content_hash
+    finally:
+        # Already renamed when the blob was stored
+        await run_in_threadpool(remove_file, temp_path)
@@ -0,0 +1,116 @@
+# app/storage/downloads.py
+
+import mimetypes
+import os
+import re
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.data.data_class import settings
+from app.storage.uploads import UPLOAD_DIR
+from utils import etag_matches
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Raised for a Range header none of whose bytes exist in the file
+class RangeNotSatisfiable(Exception):
+    pass
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range against a file size.
+
+    Returns:
+    - tuple: The first and last byte offsets, inclusive, or None when the header is
+      malformed or asks for several ranges, in which case the whole file is sent.
+
+    Raises:
+    - RangeNotSatisfiable: If the range starts past the end of the file.
+    """
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(range_header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(range_header)
+    return start, end
+
+async def iter_file(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """Read the bytes [start, end) of a file in settings.upload_chunk_size chunks."""
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = await file.read(min(settings.upload_chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+async def document_response(request: Request, path: str, file_name: Optional[str] = None, content_hash: Optional[str] = None) -> Optional[Response]:
+    """
+    Response serving an uploaded document.
+
+    Uploads never change: the ETag is the content hash (size and mtime for documents
+    stored before the blob store) and the response may be cached forever by the
+    client. A single byte range is served as 206. With settings.download_offload the
+    bytes are left to the front proxy through X-Accel-Redirect or X-Sendfile.
+
+    Returns:
+    - Response: The response, or None if the file is missing on disk.
+    """
+    try:
+        stat = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        return None
+    etag = f'"{content_hash}"' if content_hash else f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    filename = file_name or os.path.basename(path)
+    headers = {
+        "ETag": etag,
+        # private: the document was served after a permission check
+        "Cache-Control": f"private, max-age={settings.document_cache_max_age}, immutable",
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(filename),
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if settings.download_offload == "x-accel-redirect":
+        headers["X-Accel-Redirect"] = settings.download_accel_prefix + os.path.relpath(path, UPLOAD_DIR)
+        return Response(headers=headers, media_type=media_type)
+    if settings.download_offload == "x-sendfile":
+        headers["X-Sendfile"] = os.path.abspath(path)
+        return Response(headers=headers, media_type=media_type)
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get("range")
+    # If-Range: only send a part of the file the client already has a part of
+    if range_header and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(iter_file(path, start, end + 1), status_code=206, headers=headers, media_type=media_type)
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(iter_file(path, 0, size), headers=headers, media_type=media_type)
@@ -0,0 +1,37 @@
+# app/storage/images.py
+
+# Runs in the thumbnail worker processes: keep the imports of this module light
+import os
+import tempfile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+def render_thumbnail(source: str, destination: str, size: int) -> bool:
+    """
+    Write a JPEG thumbnail of an image, fitting in size x size pixels.
+
+    The thumbnail is written next to the destination and renamed over it once
+    complete, like the uploads.
+
+    Returns:
+    - bool: False if the source is not an image Pillow can read.
+    """
+    try:
+        with Image.open(source) as image:
+            image.draft("RGB", (size, size))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            directory = os.path.dirname(destination)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".thumb-", suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as temp_file:
+                    image.save(temp_file, "JPEG", quality=80, optimize=True)
+                os.replace(temp_path, destination)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+    except (UnidentifiedImageError, OSError):
+        return False
+    return True
@@ -0,0 +1,89 @@
+# app/storage/thumbnails.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+from app.models.tasks import Task, TaskDocument
+from app.config.database import AsyncSessionLocal
+from app.data.data_class import settings
+from app.storage.blobs import thumbnail_path
+from app.storage.images import render_thumbnail
+from app.modules.tasks.task_versions import bump_versions, task_scopes
+
+logger = logging.getLogger("uvicorn")
+
+# Documents a thumbnail is generated for
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tif", ".tiff"}
+
+class Thumbnailer:
+    """
+    Generates the thumbnails of uploaded images in a process pool, off the request workers.
+
+    Thumbnails are keyed by content hash like the blobs, so an image uploaded again
+    reuses the existing thumbnail. Once written, the thumbnail path is recorded on
+    every TaskDocument with that content.
+    """
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = set()
+
+    def start(self):
+        # spawn: the workers do not inherit the event loop, threads and connections of the app
+        self._pool = ProcessPoolExecutor(
+            max_workers=settings.thumbnail_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def stop(self):
+        if self._pool is None:
+            return
+        for pending in list(self._pending):
+            pending.cancel()
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        await run_in_threadpool(self._pool.shutdown)
+        self._pool = None
+
+    def submit(self, document_path: str, content_hash: Optional[str]):
+        """Queue the thumbnail of a committed document, a no-op for non images."""
+        if self._pool is None or not content_hash:
+            return
+        if os.path.splitext(document_path)[1].lower() not in IMAGE_EXTENSIONS:
+            return
+        pending = asyncio.create_task(self._generate(document_path, content_hash))
+        self._pending.add(pending)
+        pending.add_done_callback(self._pending.discard)
+
+    async def _generate(self, document_path: str, content_hash: str):
+        destination = thumbnail_path(content_hash)
+        try:
+            if not await run_in_threadpool(os.path.exists, destination):
+                loop = asyncio.get_running_loop()
+                rendered = await loop.run_in_executor(
+                    self._pool, render_thumbnail, document_path, destination, settings.thumbnail_size,
+                )
+                if not rendered:
+                    return
+            async with AsyncSessionLocal() as db:
+                assignments = (await db.execute(
+                    select(Task.user_id, Task.role_id).join(TaskDocument, TaskDocument.task_id == Task.id)
+                    .filter(TaskDocument.content_hash == content_hash).distinct()
+                )).all()
+                await db.execute(
+                    update(TaskDocument)
+                    .where(TaskDocument.content_hash == content_hash, TaskDocument.thumbnail_path.is_(None))
+                    .values(thumbnail_path=destination)
+                )
+                # The thumbnail URL shows up in the task lists of these scopes
+                await bump_versions(db, task_scopes(assignments))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Something went wrong generating the thumbnail of {document_path}")
+            logger.error(str(e))
+
+# Thumbnail pipeline shared by the task services, started from the application lifespan
+thumbnailer = Thumbnailer()
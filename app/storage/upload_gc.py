@@ -0,0 +1,125 @@
+# app/storage/upload_gc.py
+
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+from app.models.tasks import TaskDocument, ArchivedTaskDocument
+from app.config.database import engine, advisory_lock
+from app.data.data_class import settings
+from app.storage.uploads import UPLOAD_DIR, remove_file
+from app.storage.blobs import THUMB_DIR
+
+logger = logging.getLogger("uvicorn")
+
+def old_files(directory: str, horizon: float) -> Iterator[Tuple[str, int]]:
+    """
+    Walk the upload tree one directory listing at a time, yielding (path, size)
+    of the files last modified before horizon (a timestamp).
+    """
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from old_files(entry.path, horizon)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime < horizon:
+                    yield entry.path, stat.st_size
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def referenced_files(connection: Connection, paths: List[str]) -> Set[str]:
+    """
+    The paths of a batch still referenced by a current or archived document.
+
+    Documents are looked up on document_path, thumbnails on the content hash
+    they are named after; both lookups are index range scans.
+    """
+    thumbnails = {}
+    documents = []
+    for path in paths:
+        if path.startswith(THUMB_DIR + "/"):
+            thumbnails[os.path.splitext(os.path.basename(path))[0]] = path
+        else:
+            documents.append(path)
+    referenced = set()
+    for model in (TaskDocument, ArchivedTaskDocument):
+        if documents:
+            referenced.update(connection.scalars(
+                select(model.document_path).filter(model.document_path.in_(documents)).distinct()
+            ))
+        if thumbnails:
+            referenced.update(thumbnails[content_hash] for content_hash in connection.scalars(
+                select(model.content_hash).filter(model.content_hash.in_(list(thumbnails))).distinct()
+            ))
+    return referenced
+
+def collect_uploads(
+        bind: Engine = engine,
+        directory: str = UPLOAD_DIR,
+        grace: timedelta = timedelta(minutes=settings.upload_gc_grace_minutes),
+        batch_size: int = settings.bulk_batch_size,
+    ) -> Tuple[int, int]:
+    """
+    Remove the files under the upload directory that no document row references.
+
+    Task and user deletions only drop the rows; this reconciles the directory
+    against tasks_documents and tasks_documents_archive afterwards, batch_size
+    files at a time, so neither the tree nor the tables are ever loaded whole.
+    Files modified within grace are kept: an upload reaches the disk before its
+    row is committed, and a deduplicated blob is touched when it is reused. Only
+    one worker collects at a time, the others skip the run.
+
+    Returns:
+    - tuple: The number of files removed and the bytes reclaimed, (0, 0) if another worker holds the lock.
+    """
+    removed = reclaimed = 0
+    horizon = time.time() - grace.total_seconds()
+    with bind.connect() as connection:
+        with advisory_lock(connection, "upload_gc") as acquired:
+            if not acquired:
+                return 0, 0
+            for batch in batched(old_files(directory, horizon), batch_size):
+                referenced = referenced_files(connection, [path for path, _ in batch])
+                # End the read transaction, a long snapshot would hide new rows
+                connection.rollback()
+                for path, size in batch:
+                    if path not in referenced:
+                        remove_file(path)
+                        removed += 1
+                        reclaimed += size
+    return removed, reclaimed
+
+async def run_upload_gc():
+    """Collect every settings.upload_gc_minutes, started from the application lifespan."""
+    while True:
+        try:
+            removed, reclaimed = await run_in_threadpool(collect_uploads)
+            if removed:
+                logger.info(f"Removed {removed} orphaned uploads, {reclaimed} bytes reclaimed")
+        except Exception as e:
+            logger.error("Something went wrong in the upload garbage collector")
+            logger.error(str(e))
+        await asyncio.sleep(settings.upload_gc_minutes * 60)
+
+# Collect manually: python -m app.storage.upload_gc
+if __name__ == "__main__":
+    removed, reclaimed = collect_uploads()
+    print(f"{removed} files removed, {reclaimed} bytes reclaimed")
@@ -0,0 +1,127 @@
+# app/storage/uploads.py
+
+import os
+import tempfile
+from typing import Tuple
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from app.data.data_class import settings
+from app.config.database import msg
+
+# Directory holding the uploaded documents
+UPLOAD_DIR = "static/uploads"
+
+# Raised when an uploaded file grows past settings.max_upload_size
+class UploadTooLarge(Exception):
+    pass
+
+# Remove a file if it still exists
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def spool_upload(file: UploadFile, directory: str, max_size: int = None, digest=None) -> Tuple[str, int]:
+    """
+    Stream an uploaded file to a temporary file in fixed-size chunks.
+
+    Each chunk is written, and fed to the digest when one is given, in the threadpool,
+    so the upload is read once and neither step runs on the event loop.
+
+    Parameters:
+    - file (UploadFile): The uploaded file.
+    - directory (str): Directory of the temporary file, on the filesystem of its final path.
+    - max_size (int): Size limit in bytes, defaults to settings.max_upload_size.
+    - digest: Optional hashlib object updated with the content.
+
+    Returns:
+    - tuple: The path of the temporary file, to rename or remove, and the number of bytes written.
+
+    Raises:
+    - UploadTooLarge: If the file exceeds the size limit, nothing is left on disk.
+    """
+    max_size = settings.max_upload_size if max_size is None else max_size
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    fd, temp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-", suffix=".part")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            def write(chunk: bytes):
+                if digest is not None:
+                    digest.update(chunk)
+                temp_file.write(chunk)
+
+            while chunk := await file.read(settings.upload_chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(f"{file.filename} exceeds {max_size} bytes")
+                await run_in_threadpool(write, chunk)
+    except BaseException:
+        await run_in_threadpool(remove_file, temp_path)
+        raise
+    return temp_path, size
+
+async def save_upload(file: UploadFile, destination: str, max_size: int = None) -> int:
+    """
+    Stream an uploaded file to disk in fixed-size chunks.
+
+    The data is written to a temporary file next to the destination, off the event
+    loop, and renamed over the destination only once it is complete, so a partial
+    file is never visible under its final name.
+
+    Parameters:
+    - file (UploadFile): The uploaded file.
+    - destination (str): Final path of the file.
+    - max_size (int): Size limit in bytes, defaults to settings.max_upload_size.
+
+    Returns:
+    - int: The number of bytes written.
+
+    Raises:
+    - UploadTooLarge: If the file exceeds the size limit, nothing is left on disk.
+    """
+    temp_path, size = await spool_upload(file, os.path.dirname(destination), max_size)
+    try:
+        await run_in_threadpool(os.replace, temp_path, destination)
+    except BaseException:
+        await run_in_threadpool(remove_file, temp_path)
+        raise
+    return size
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware rejecting multipart requests larger than the upload limit
+    while the body arrives, before it is spooled by the form parser.
+
+    A declared Content-Length over the limit is answered with 413 right away;
+    chunked bodies are counted as they are received.
+    """
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse({"detail": msg["file_too_large"]}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            return await response(scope, receive, send)
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI re-raises HTTPException from body parsing as is
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=msg["file_too_large"])
+            return message
+
+        return await self.app(scope, limited_receive, send)
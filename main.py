@@ -1,11 +1,14 @@
 # main.py
 
-from fastapi import FastAPI, Body, Depends
+import asyncio
+from fastapi import FastAPI, Body, Depends, Request
 from app.models.users import User
-from app.config.database import get_db, msg
+from app.config.database import get_async_db, msg
 from app.auth.auth import signJWT
-from utils import verify_password
+from app.auth.hashing import hasher
+from app.auth.rate_limit import limit_login
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from app.dto.users_schemas import UserLoginSchema
 from app.dto.tasks_schema import ResponseData
@@ -14,12 +17,20 @@ from app.models.users import Base as user_base
 from app.models.tasks import Base as task_base
 from app.models.roles import RoleBase as role_base
 from app.models.status import StatusBase as status_base
-from app.config.database import engine
+from app.config.database import engine, async_engine
+from app.config.migrations import run_migrations
 from app.modules.users.user_routers import router as user_router
 from app.modules.tasks.task_routers import router as task_router
+from app.modules.tasks.task_reminders import reminders
+from app.modules.tasks.task_overdue import run_overdue_sweeper
+from app.modules.tasks.task_archive import run_task_archiver
+from app.storage.thumbnails import thumbnailer
+from app.storage.upload_gc import run_upload_gc
 # from app.modules.authentication.auth_routers import router as auth_router
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from app.storage.uploads import UploadSizeLimitMiddleware
+from app.data.data_class import settings
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Application description
 description = """
@@ -33,13 +44,34 @@ async def lifespan(app: FastAPI):
     task_base.metadata.create_all(bind=engine)
     role_base.metadata.create_all(bind=engine)
     status_base.metadata.create_all(bind=engine)
+    # create_all never alters existing tables, apply pending schema migrations
+    run_migrations(engine)
+    if settings.reminders_enabled:
+        await reminders.start()
+    sweeper = asyncio.create_task(run_overdue_sweeper()) if settings.overdue_sweep_minutes else None
+    archiver = asyncio.create_task(run_task_archiver()) if settings.archive_interval_minutes else None
+    upload_gc = asyncio.create_task(run_upload_gc()) if settings.upload_gc_minutes else None
+    thumbnailer.start()
+    hasher.start()
     yield
+    if sweeper:
+        sweeper.cancel()
+    if archiver:
+        archiver.cancel()
+    if upload_gc:
+        upload_gc.cancel()
+    await thumbnailer.stop()
+    hasher.stop()
+    await reminders.stop()
+    await async_engine.dispose()
 
 # Create FastAPI app instance
 app = FastAPI(
     title='Task Management System API',
     lifespan=lifespan,
     description=description,
+    # Responses are encoded with orjson instead of the standard json module
+    default_response_class=ORJSONResponse,
     version="1.0.0",
 )
 
@@ -51,44 +83,49 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=["*"]
 )
+# Reject oversized multipart bodies while they arrive (1 MiB allowance for the form fields)
+app.add_middleware(UploadSizeLimitMiddleware, max_body_size=settings.max_upload_size + 1024 * 1024)
 # Root path endpoint
 @app.get("/", tags=["General"])
 def read_root():
     return {"message": "This is the root path"}
 
-# Mount the static directory for serving uploaded files
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-def check_user(data: UserLoginSchema, db: Session):
+async def check_user(data: UserLoginSchema, db: AsyncSession):
     """
     Helper function to check user credentials during login.
 
     Parameters:
     - data (UserLoginSchema): The login data containing email and password.
-    - db (Session): The SQLAlchemy database session.
+    - db (AsyncSession): The SQLAlchemy async database session.
 
     Returns:
     - User: The user if credentials are valid, else None.
     """
-    db_user = db.query(User).filter(User.email == data.email).first()
-    if db_user and verify_password(data.password, db_user.password):
+    db_user = await db.scalar(select(User).filter(User.email == data.email))
+    if db_user and await hasher.verify(data.password, db_user.password):
         return db_user
     return None
 
 
 @app.post("/user/login", response_model=ResponseData, tags=["Authentication"])
-async def user_login(user: UserLoginSchema = Body(...), db: Session = Depends(get_db)):
+async def user_login(request: Request, user: UserLoginSchema = Body(...), db: AsyncSession = Depends(get_async_db)):
     """
     Endpoint to handle user login.
 
     Parameters:
+    - request (Request): The incoming request, its client address is rate limited.
     - user (UserLoginSchema): The login data containing email and password.
-    - db (Session): The SQLAlchemy database session.
+    - db (AsyncSession): The SQLAlchemy async database session.
 
     Returns:
     - ResponseData: Status, message, user data, and JWT token if login is successful, otherwise an error message.
+
+    Raises:
+    - HTTPException: 429 when the client address or the email exceeds its login rate.
     """
-    db_user = check_user(user, db)
+    # Before the database lookup and the bcrypt verify
+    await limit_login(request, user.email)
+    db_user = await check_user(user, db)
     if db_user:
         user_data = {
             "id": db_user.id,
@@ -0,0 +1,104 @@
+# tests/bench_serialization.py
+"""
+Time to build a page of tasks from ORM objects and to encode it to the response body.
+
+    python -m tests.bench_serialization [--tasks 10000] [--runs 25]
+
+Compares three paths, each step reported as the best of --runs:
+- dicts + json: the hand-built task dicts encoded by FastAPI's default JSONResponse
+- TaskOut + response_model + orjson: the ResponseData returned as is, which FastAPI dumps
+  and validates again against response_model before ORJSONResponse encodes it
+- TaskOut + ModelResponse: the ResponseData serialized once by pydantic-core
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Union
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+# Settings defaults for the app imports
+import tests.conftest
+from app.data.data_class import settings
+from app.dto.tasks_schema import ModelResponse, ResponseData, TaskOut
+from app.models.tasks import Task, TaskDocument
+
+class DictResponseData(BaseModel):
+    """ResponseData as it was before the typed models."""
+    status: bool
+    message: str
+    data: Union[dict, list, None]
+    next_cursor: Optional[str] = None
+
+def make_tasks(count: int) -> list:
+    return [
+        Task(
+            id=task_id, title=f"task {task_id}", description="description", status_id=2,
+            due_date=datetime(2024, 1, 1), user_id=3, role_id=3, created_by_id=1, updated_by_id=1,
+            created_at=datetime(2024, 1, 1),
+            documents=[TaskDocument(id=task_id, document_path=f"static/uploads/{task_id}.txt")],
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+def task_dict(task: Task) -> dict:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "status_id": task.status_id,
+        "due_date": task.due_date,
+        "user_id": task.user_id,
+        "role_id": task.role_id,
+        "created_by_id": task.created_by_id,
+        "updated_by_id": task.updated_by_id,
+        "created_at": task.created_at,
+        "document_path": [{"document_path": f"{settings.base_url}/{document.document_path}"} for document in task.documents],
+    }
+
+def build_dicts(tasks: list) -> BaseModel:
+    return DictResponseData(status=True, message="tasks", data=[task_dict(task) for task in tasks])
+
+def build_models(tasks: list) -> BaseModel:
+    return ResponseData(status=True, message="tasks", data=[TaskOut.model_validate(task) for task in tasks])
+
+async def encode_json(content: BaseModel, field) -> bytes:
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+async def encode_orjson(content: BaseModel, field) -> bytes:
+    return ORJSONResponse(await serialize_response(field=field, response_content=content)).body
+
+async def encode_model_response(content: BaseModel, field) -> bytes:
+    return ModelResponse(content).body
+
+async def main(count: int, runs: int):
+    tasks = make_tasks(count)
+    paths = [
+        ("dicts + json", build_dicts, encode_json, create_response_field(name="Response_dicts", type_=DictResponseData, mode="serialization")),
+        ("TaskOut + response_model + orjson", build_models, encode_orjson, create_response_field(name="Response_models", type_=ResponseData, mode="serialization")),
+        ("TaskOut + ModelResponse", build_models, encode_model_response, None),
+    ]
+    # The paths take turns so a noisy machine slows them alike
+    timings = {name: ([], []) for name, *_ in paths}
+    for _ in range(runs):
+        for name, build, encode, field in paths:
+            started = time.perf_counter()
+            content = build(tasks)
+            built = time.perf_counter()
+            await encode(content, field)
+            timings[name][0].append(built - started)
+            timings[name][1].append(time.perf_counter() - built)
+    print(f"{count} tasks, best of {runs}:{'build':>18}{'encode':>10}")
+    for name, *_ in paths:
+        build_time, encode_time = (min(values) * 1000 for values in timings[name])
+        print(f"{name:<36}{build_time:7.1f} ms{encode_time:7.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.runs))
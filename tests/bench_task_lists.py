@@ -0,0 +1,87 @@
+# tests/bench_task_lists.py
+"""
+Throughput of concurrent /tasks/all requests while every task query takes
+--delay seconds in the database driver, as a slow MySQL query would.
+
+    python -m tests.bench_task_lists [--requests 100] [--concurrency 10] [--delay 0.05]
+
+Runs on a SQLite file through the ASGI transport, no server, MySQL or .env needed.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import re
+import time
+from datetime import datetime
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+# Settings defaults and the SQLite adjustments of the models
+from tests.conftest import METADATA, database
+from app.auth.auth import get_current_user
+from app.auth.principals import Principal
+from app.models.tasks import Task, TaskDocument
+from app.models.users import User
+from main import app
+
+def slow_task_queries(delay: float):
+    """SQLite trace callback sleeping on the thread running the statement."""
+    def trace(statement: str):
+        if re.match(r"\s*SELECT\b.*\bFROM tasks\b", statement, re.S):
+            time.sleep(delay)
+    return trace
+
+def seed(engine, tasks: int):
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{"id": 1, "email": "admin@example.com", "name": "admin", "role_id": 1, "password": "x"}])
+        connection.execute(Task.__table__.insert(), [
+            {"id": task_id, "title": f"task {task_id}", "status_id": 2, "due_date": datetime(2024, 1, 1),
+             "user_id": 1, "role_id": 1, "created_by_id": 1}
+            for task_id in range(1, tasks + 1)
+        ])
+        connection.execute(TaskDocument.__table__.insert(), [
+            {"task_id": task_id, "document_path": f"static/uploads/{task_id}.txt"} for task_id in range(1, tasks + 1)
+        ])
+
+async def run(requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+        async def request(n: int):
+            async with semaphore:
+                # A distinct page size per request keeps the list cache out of the measure
+                response = await client.get("/tasks/all", params={"limit": 1 + n % 100})
+                assert response.json()["status"]
+        started = time.perf_counter()
+        await asyncio.gather(*(request(n) for n in range(requests)))
+        return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--tasks", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"{directory}/bench.db"
+        engine = create_engine(f"sqlite:///{url}")
+        for metadata in METADATA:
+            metadata.create_all(engine)
+        seed(engine, args.tasks)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+        trace = slow_task_queries(args.delay)
+        event.listen(async_engine.sync_engine, "connect", lambda connection, record: connection.run_async(
+            lambda driver_connection: driver_connection.set_trace_callback(trace)))
+        database.AsyncSessionLocal.configure(bind=async_engine)
+        app.dependency_overrides[get_current_user] = lambda: Principal(id=1, email="admin@example.com", name="admin", role_id=1)
+
+        elapsed = asyncio.run(run(args.requests, args.concurrency))
+        print(f"{args.requests} requests, {args.concurrency} concurrent, {args.delay * 1000:.0f} ms per task query: "
+              f"{elapsed:.2f} s, {args.requests / elapsed:.1f} req/s")
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# tests/conftest.py
+
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+
+# Settings are read from the environment when the app is imported
+for key, value in {
+    "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test", "MAIL_FROM": "test@example.com", "MAIL_PORT": "25",
+    "DATABASE_USERNAME": "test", "DATABASE_PASSWORD": "test", "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_PORT": "3306", "DATABASE_NAME": "test", "SECRET_KEY": "test", "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30", "BASE_URL": "http://testserver", "OTP_EXPIRE": "5",
+    "REMINDERS_ENABLED": "false", "RATE_LIMIT_ENABLED": "false",
+}.items():
+    os.environ.setdefault(key, value)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import DefaultClause, create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+# The models first, app.config.database imports them back
+from app.models.users import Base as UserBase, User, Token
+import app.config.database as database
+from app.models.tasks import Base as TaskBase
+from app.models.roles import RoleBase
+from app.models.status import StatusBase
+from app.auth.principals import Principal
+
+METADATA = (RoleBase.metadata, StatusBase.metadata, UserBase.metadata, TaskBase.metadata)
+
+# SQLite has no now(), no ON UPDATE and no AUTOINCREMENT on the composite users keys
+for metadata in METADATA:
+    for table in metadata.tables.values():
+        for column in table.columns:
+            if column.server_default is not None:
+                column.server_default = DefaultClause(text("CURRENT_TIMESTAMP"))
+User.__table__.c.id.autoincrement = False
+Token.__table__.c.id.autoincrement = False
+
+class StatementCounter:
+    """Statements sent to the database, recorded by a before_cursor_execute listener."""
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def reset(self):
+        self.statements.clear()
+
+    def count(self, prefix: str = "") -> int:
+        return sum(statement.lstrip().upper().startswith(prefix) for statement in self.statements)
+
+@contextmanager
+def statement_lock(connection, name, timeout=0):
+    """Stand-in for advisory_lock running a statement like GET_LOCK on MySQL, which autobegins a transaction."""
+    connection.execute(text("SELECT 1"))
+    yield True
+
+@pytest.fixture
+def engines(tmp_path):
+    """
+    Sync and async engines on a fresh SQLite file, bound to the application session
+    factories, with a statement counter on both.
+    """
+    url = f"{tmp_path}/test.db"
+    engine = create_engine(f"sqlite:///{url}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    for metadata in METADATA:
+        metadata.create_all(engine)
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    database.SessionLocal.configure(bind=engine)
+    database.AsyncSessionLocal.configure(bind=async_engine)
+    yield engine, async_engine, counter
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+@pytest.fixture
+def users(engines):
+    """A SUPERADMIN (1), a MANAGER (2) and two AGENTs (3, 4), as the principals get_current_user returns."""
+    engine, _, _ = engines
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [
+            {"id": user_id, "email": f"user{user_id}@example.com", "name": f"user{user_id}", "role_id": role_id, "password": "x"}
+            for user_id, role_id in [(1, 1), (2, 2), (3, 3), (4, 3)]
+        ])
+    return {
+        user_id: Principal(id=user_id, email=f"user{user_id}@example.com", name=f"user{user_id}", role_id=role_id)
+        for user_id, role_id in [(1, 1), (2, 2), (3, 3), (4, 3)]
+    }
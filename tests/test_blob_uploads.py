@@ -0,0 +1,45 @@
+import asyncio
+import hashlib
+import io
+import os
+from starlette.datastructures import UploadFile
+from app.storage import blobs
+
+class CountingFile(io.BytesIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+class Session:
+    """The TaskDocument lookup of store_upload, answering the path of a stored blob."""
+    def __init__(self, existing_path=None):
+        self.existing_path = existing_path
+
+    async def scalar(self, statement):
+        return self.existing_path
+
+def test_uploads_are_hashed_while_written_and_deduplicated(tmp_path, monkeypatch):
+    monkeypatch.setattr(blobs, "BLOB_DIR", str(tmp_path / "blobs"))
+    content = os.urandom(3 * 1024 * 1024 + 7)
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    def upload():
+        raw = CountingFile(content)
+        return raw, UploadFile(raw, filename="Report.PDF")
+
+    raw, file = upload()
+    path, stored_hash = asyncio.run(blobs.store_upload(Session(), file))
+    assert stored_hash == content_hash
+    assert path == f"{tmp_path}/blobs/{content_hash[:2]}/{content_hash}.pdf"
+    assert raw.bytes_read == len(content)
+    with open(path, "rb") as stored:
+        assert stored.read() == content
+
+    # The same content again keeps the stored blob and leaves no temporary file
+    raw, file = upload()
+    assert asyncio.run(blobs.store_upload(Session(path), file)) == (path, content_hash)
+    assert raw.bytes_read == len(content)
+    assert sorted(p.name for p in (tmp_path / "blobs").rglob("*") if p.is_file()) == [f"{content_hash}.pdf"]
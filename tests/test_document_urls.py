@@ -0,0 +1,45 @@
+# tests/test_document_urls.py
+
+import asyncio
+import httpx
+from datetime import datetime
+from app.models.tasks import Task, TaskDocument
+from app.auth.auth import get_current_user
+from main import app
+
+def get(principal, path: str) -> httpx.Response:
+    async def request():
+        app.dependency_overrides[get_current_user] = lambda: principal
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+                return await client.get(path)
+        finally:
+            app.dependency_overrides.clear()
+    return asyncio.run(request())
+
+def test_documents_are_only_linked_through_the_checked_endpoints(engines, users, tmp_path):
+    engine, _, _ = engines
+    document = tmp_path / "report.txt"
+    document.write_text("report")
+    thumbnail = tmp_path / "report.jpg"
+    thumbnail.write_bytes(b"thumbnail")
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"id": 1, "title": "task", "status_id": 2, "due_date": datetime(2024, 1, 1), "user_id": 3, "role_id": 3, "created_by_id": 1}
+        ])
+        connection.execute(TaskDocument.__table__.insert(), [
+            {"id": 7, "task_id": 1, "document_path": str(document), "thumbnail_path": str(thumbnail), "file_name": "report.txt"}
+        ])
+
+    tasks = get(users[3], "/tasks/me").json()["data"]
+    assert tasks[0]["document_path"] == [{
+        "id": 7,
+        "document_path": "http://testserver/tasks/documents/7",
+        "thumbnail_path": "http://testserver/tasks/documents/7/thumbnail",
+    }]
+    assert get(users[3], "/tasks/documents/7").text == "report"
+    assert get(users[3], "/tasks/documents/7/thumbnail").content == b"thumbnail"
+    # The other agent does not see the task, and the files are not served statically
+    assert get(users[4], "/tasks/documents/7").json()["status"] is False
+    assert get(users[4], "/tasks/documents/7/thumbnail").json()["status"] is False
+    assert get(users[4], f"/static/uploads/{document.name}").status_code == 404
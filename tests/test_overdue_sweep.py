@@ -0,0 +1,56 @@
+# tests/test_overdue_sweep.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app.models.tasks import Task, TaskHistory, TaskStats
+from app.modules.tasks import task_overdue
+from app.modules.tasks.task_overdue import ON_HOLD_STATUS_ID, sweep_overdue_tasks
+from app.modules.tasks.task_stats import rebuild_task_stats
+from tests.conftest import statement_lock
+
+def stats_snapshot(connection):
+    return sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
+
+def test_sweep_after_a_lock_statement(engines, users, monkeypatch):
+    engine, _, _ = engines
+    monkeypatch.setattr(task_overdue, "advisory_lock", statement_lock)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"title": f"task {i}", "status_id": status_id, "due_date": now + timedelta(days=days), "user_id": 3, "role_id": 3, "created_by_id": 1}
+            for i, (status_id, days) in enumerate([(1, -1), (2, -2), (3, -3), (2, -4), (1, -5), (2, 1), (3, 2), (5, -1)])
+        ])
+        rebuild_task_stats(connection)
+
+    assert sweep_overdue_tasks(engine, batch_size=2) == 5
+
+    with engine.begin() as connection:
+        on_hold = connection.scalar(select(func.count()).select_from(Task).filter(Task.status_id == ON_HOLD_STATUS_ID))
+        history = connection.scalar(select(func.count()).select_from(TaskHistory))
+        counters = stats_snapshot(connection)
+        rebuild_task_stats(connection)
+        assert counters == stats_snapshot(connection)
+    assert on_hold == 5
+    assert history == 5
+    assert sweep_overdue_tasks(engine, batch_size=2) == 0
+
+def test_sweep_flags_a_task_once_per_due_date(engines, users, monkeypatch):
+    engine, _, _ = engines
+    monkeypatch.setattr(task_overdue, "advisory_lock", statement_lock)
+    due_date = datetime.utcnow() - timedelta(days=1)
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"id": 1, "title": "task", "status_id": 2, "due_date": due_date, "user_id": 3, "role_id": 3, "created_by_id": 1}
+        ])
+    assert sweep_overdue_tasks(engine) == 1
+
+    # Put back in progress past its due date: left alone until the due date changes
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.update().values(status_id=2))
+    assert sweep_overdue_tasks(engine) == 0
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.update().values(due_date=due_date + timedelta(hours=1)))
+    assert sweep_overdue_tasks(engine) == 1
+
+    with engine.begin() as connection:
+        assert connection.scalar(select(func.count()).select_from(TaskHistory)) == 2
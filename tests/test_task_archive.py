@@ -0,0 +1,42 @@
+# tests/test_task_archive.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app.models.tasks import Task, TaskHistory, TaskDocument, TaskStats, ArchivedTask, ArchivedTaskHistory, ArchivedTaskDocument
+from app.modules.tasks import task_archive
+from app.modules.tasks.task_archive import archive_completed_tasks
+from app.modules.tasks.task_stats import rebuild_task_stats
+from tests.conftest import statement_lock
+
+def count(connection, model) -> int:
+    return connection.scalar(select(func.count()).select_from(model))
+
+def test_archive_after_a_lock_statement(engines, users, monkeypatch):
+    engine, _, _ = engines
+    monkeypatch.setattr(task_archive, "advisory_lock", statement_lock)
+    old = datetime.utcnow() - timedelta(days=200)
+    with engine.begin() as connection:
+        # Tasks 1, 3 and 5 are completed
+        connection.execute(Task.__table__.insert(), [
+            {"id": task_id, "title": f"task {task_id}", "status_id": 5 if task_id % 2 else 2, "due_date": old,
+             "user_id": 3, "role_id": 3, "created_by_id": 1, "updated_at": old}
+            for task_id in range(1, 7)
+        ])
+        connection.execute(TaskHistory.__table__.insert(), [
+            {"task_id": task_id, "status_id": 2, "comments": "created"} for task_id in range(1, 7)
+        ])
+        connection.execute(TaskDocument.__table__.insert(), [
+            {"task_id": task_id, "document_path": f"static/uploads/{task_id}.txt"} for task_id in range(1, 7)
+        ])
+        rebuild_task_stats(connection)
+
+    assert archive_completed_tasks(engine, timedelta(days=90), batch_size=2) == 3
+
+    with engine.begin() as connection:
+        assert sorted(connection.scalars(select(ArchivedTask.id))) == [1, 3, 5]
+        assert (count(connection, Task), count(connection, TaskHistory), count(connection, TaskDocument)) == (3, 3, 3)
+        assert (count(connection, ArchivedTaskHistory), count(connection, ArchivedTaskDocument)) == (3, 3)
+        counters = sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
+        rebuild_task_stats(connection)
+        assert counters == sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
+    assert archive_completed_tasks(engine, timedelta(days=90), batch_size=2) == 0
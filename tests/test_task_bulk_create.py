@@ -0,0 +1,45 @@
+# tests/test_task_bulk_create.py
+
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from app.config import database
+from app.data.data_class import settings
+from app.models.tasks import Task, TaskStats
+from app.modules.tasks import task_services
+from app.modules.tasks.task_services import bulk_create_tasks
+from app.modules.tasks.task_stats import rebuild_task_stats
+
+def item(title: str) -> dict:
+    return {"title": title, "description": "description", "due_date": "2024-01-01", "status_id": 2, "user_id": 3}
+
+def test_a_rejected_batch_fails_its_items_only(engines, users, monkeypatch):
+    engine, _, _ = engines
+    monkeypatch.setattr(settings, "bulk_batch_size", 2)
+    # The database rejects the second batch
+    apply_stats_deltas = task_services.apply_stats_deltas
+    calls = []
+    async def rejecting_stats_deltas(db, deltas):
+        calls.append(deltas)
+        if len(calls) == 2:
+            raise OperationalError("INSERT INTO tasks_stats", {}, Exception("rejected"))
+        await apply_stats_deltas(db, deltas)
+    monkeypatch.setattr(task_services, "apply_stats_deltas", rejecting_stats_deltas)
+
+    async def create():
+        async def items():
+            # Item 1 is longer than the title column
+            for title in ["task 0", "x" * 101, "task 2", "task 3", "task 4"]:
+                yield item(title)
+        async with database.AsyncSessionLocal() as db:
+            return await bulk_create_tasks(db, users[1], items())
+
+    results = asyncio.run(create())
+
+    assert [result["status"] for result in results] == [True, False, False, False, True]
+    assert results[1]["message"] != results[2]["message"] == results[3]["message"]
+    with engine.begin() as connection:
+        assert connection.scalars(select(Task.title).order_by(Task.id)).all() == ["task 0", "task 4"]
+        counters = sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
+        rebuild_task_stats(connection)
+        assert counters == sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
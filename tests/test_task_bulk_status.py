@@ -0,0 +1,44 @@
+# tests/test_task_bulk_status.py
+
+import asyncio
+from datetime import datetime
+from sqlalchemy import select
+from app.config import database
+from app.data.data_class import settings
+from app.dto.tasks_schema import BulkStatusUpdate
+from app.models.tasks import Task, TaskStats
+from app.modules.tasks.task_services import bulk_update_task_status
+from app.modules.tasks.task_stats import rebuild_task_stats
+
+def test_counters_are_written_after_every_task_batch(engines, users, monkeypatch):
+    engine, _, counter = engines
+    monkeypatch.setattr(settings, "bulk_batch_size", 2)
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"id": task_id, "title": f"task {task_id}", "status_id": 2, "due_date": datetime(2024, 1, 1),
+             "user_id": 3 if task_id % 2 else 4, "role_id": 3, "created_by_id": 1}
+            for task_id in range(1, 6)
+        ])
+        rebuild_task_stats(connection)
+
+    async def update():
+        async with database.AsyncSessionLocal() as db:
+            counter.reset()
+            return await bulk_update_task_status(db, users[1], BulkStatusUpdate(task_ids=[1, 2, 3, 4, 5, 6], status_id=3))
+
+    status, _, data = asyncio.run(update())
+
+    assert status
+    assert data == {"updated": [1, 2, 3, 4, 5], "not_found": [6], "forbidden": []}
+    statements = [statement.upper() for statement in counter.statements]
+    task_writes = [n for n, statement in enumerate(statements) if "TASKS_HISTORIES" in statement or statement.startswith("SELECT")]
+    stats = [n for n, statement in enumerate(statements) if "INTO TASKS_STATS" in statement]
+    versions = [n for n, statement in enumerate(statements) if "INTO LIST_VERSIONS" in statement]
+    # Three batches of task rows, then one stats upsert and one version upsert, in update_task's order
+    assert len(task_writes) == 6
+    assert len(stats) == len(versions) == 1
+    assert max(task_writes) < stats[0] < versions[0]
+    with engine.begin() as connection:
+        counters = sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
+        rebuild_task_stats(connection)
+        assert counters == sorted(connection.execute(select(TaskStats).filter(TaskStats.task_count != 0)).all())
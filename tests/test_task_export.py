@@ -0,0 +1,40 @@
+# tests/test_task_export.py
+
+import asyncio
+import json
+import re
+from datetime import datetime
+from app.models.tasks import Task, TaskHistory, TaskDocument
+from app.data.data_class import settings
+from app.modules.tasks.task_services import export_tasks
+
+async def collect(generator) -> str:
+    return "".join([chunk async for chunk in generator])
+
+def test_export_pages_every_task_with_documents_and_history(engines, users, monkeypatch):
+    engine, _, counter = engines
+    monkeypatch.setattr(settings, "export_batch_size", 3)
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"id": task_id, "title": f"task {task_id}", "status_id": 2, "due_date": datetime(2024, 1, task_id),
+             "user_id": 3 if task_id != 4 else 4, "role_id": 3, "created_by_id": 1}
+            for task_id in range(1, 9)
+        ])
+        connection.execute(TaskHistory.__table__.insert(), [
+            {"task_id": task_id, "status_id": 2, "comments": f"history {task_id}"} for task_id in range(1, 9)
+        ])
+        connection.execute(TaskDocument.__table__.insert(), [
+            {"task_id": task_id, "document_path": f"static/uploads/{task_id}.txt"} for task_id in range(1, 9)
+        ])
+    counter.reset()
+
+    rows = [json.loads(line) for line in asyncio.run(collect(export_tasks(users[3]))).splitlines()]
+
+    # Task 4 belongs to the other agent
+    assert [row["id"] for row in rows] == [1, 2, 3, 5, 6, 7, 8]
+    assert all(len(row["document_path"]) == 1 and len(row["history"]) == 1 for row in rows)
+    # 7 tasks in batches of 3: one bounded task query per batch, each with one IN query per relationship
+    task_queries = [statement for statement in counter.statements if re.search(r"FROM tasks\s+(WHERE|ORDER|LIMIT)", statement)]
+    assert len(task_queries) == 3
+    assert all("LIMIT" in statement for statement in task_queries)
+    assert counter.count("SELECT") == 9
@@ -0,0 +1,43 @@
+# tests/test_task_list_queries.py
+
+import asyncio
+from datetime import datetime
+from app.config import database
+from app.models.tasks import Task, TaskDocument
+from app.modules.tasks.task_services import get_tasks, view_all_tasks
+
+def add_tasks(engine, first: int, last: int):
+    """Tasks first..last of the agent 3, with two documents each."""
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"id": task_id, "title": f"task {task_id}", "status_id": 2, "due_date": datetime(2024, 1, 1),
+             "user_id": 3, "role_id": 3, "created_by_id": 1}
+            for task_id in range(first, last + 1)
+        ])
+        connection.execute(TaskDocument.__table__.insert(), [
+            {"task_id": task_id, "document_path": f"static/uploads/{task_id}-{n}.txt"}
+            for task_id in range(first, last + 1) for n in range(2)
+        ])
+
+def list_statements(counter, users, **list_arguments) -> tuple:
+    """Statements of one get_tasks and one view_all_tasks call, with the number of tasks each returned."""
+    async def run(service, principal):
+        async with database.AsyncSessionLocal() as db:
+            counter.reset()
+            status, _, tasks, _ = await service(db, principal, **list_arguments)
+            assert status
+            assert all(len(task.document_path) == 2 for task in tasks)
+            return len(tasks), counter.count("SELECT")
+    return asyncio.run(run(get_tasks, users[3])), asyncio.run(run(view_all_tasks, users[1]))
+
+def test_task_lists_run_a_constant_number_of_queries(engines, users):
+    engine, _, counter = engines
+    add_tasks(engine, 1, 3)
+    few = list_statements(counter, users, limit=50)
+    add_tasks(engine, 4, 40)
+    many = list_statements(counter, users, limit=50)
+
+    assert [tasks for tasks, _ in few] == [3, 3]
+    assert [tasks for tasks, _ in many] == [40, 40]
+    # One page query and one IN query for the documents, whatever the number of tasks
+    assert [statements for _, statements in few] == [statements for _, statements in many] == [2, 2]
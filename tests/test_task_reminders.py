@@ -0,0 +1,78 @@
+# tests/test_task_reminders.py
+
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from app.models.tasks import Task
+from app.modules.tasks import task_reminders
+from app.modules.tasks.task_reminders import ReminderScheduler
+
+def task_row(task_id: int, due_date: datetime) -> dict:
+    return {"id": task_id, "title": f"task {task_id}", "status_id": 2, "due_date": due_date, "user_id": 3, "role_id": 3, "created_by_id": 1}
+
+def record_reminders(monkeypatch) -> list:
+    sent = []
+    async def send_due_date_reminder(email, name, title, due_date):
+        sent.append((email, title))
+    monkeypatch.setattr(task_reminders, "send_due_date_reminder", send_due_date_reminder)
+    return sent
+
+def test_updates_inside_the_lead_time_send_one_reminder(engines, users, monkeypatch):
+    engine, _, _ = engines
+    sent = record_reminders(monkeypatch)
+    due_date = datetime.utcnow() + timedelta(hours=1)
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [task_row(1, due_date)])
+
+    async def scenario():
+        scheduler = ReminderScheduler(lead=timedelta(days=1), window=timedelta(hours=6), poll=timedelta(minutes=1), bind=engine)
+        await scheduler.start()
+        try:
+            # The create, then three status updates keeping the due date
+            for _ in range(4):
+                scheduler.schedule(1, due_date)
+                await asyncio.sleep(0.05)
+            first = len(sent)
+            # A new due date is a new reminder
+            scheduler.schedule(1, due_date + timedelta(minutes=30))
+            await asyncio.sleep(0.05)
+            return first
+        finally:
+            await scheduler.stop()
+
+    assert asyncio.run(scenario()) == 1
+    assert len(sent) == 2
+
+def test_the_elected_scheduler_sends_the_reminders_of_other_workers(engines, users, monkeypatch):
+    engine, _, _ = engines
+    sent = record_reminders(monkeypatch)
+    holders = []
+    @contextmanager
+    def named_lock(connection, name, timeout=0):
+        # GET_LOCK: granted to the first connection asking
+        acquired = not holders
+        if acquired:
+            holders.append(connection)
+        yield acquired
+    monkeypatch.setattr(task_reminders, "advisory_lock", named_lock)
+
+    async def scenario():
+        schedulers = [
+            ReminderScheduler(lead=timedelta(days=1), window=timedelta(hours=6), poll=timedelta(seconds=0.1), bind=engine)
+            for _ in range(2)
+        ]
+        for scheduler in schedulers:
+            await scheduler.start()
+        try:
+            # Written by a worker whose scheduler does not hold the lock, inside the window
+            with engine.begin() as connection:
+                connection.execute(Task.__table__.insert(), [task_row(1, datetime.utcnow() + timedelta(hours=1))])
+            schedulers[1].schedule(1, datetime.utcnow() + timedelta(hours=1))
+            await asyncio.sleep(0.5)
+            return [scheduler._leader for scheduler in schedulers]
+        finally:
+            for scheduler in schedulers:
+                await scheduler.stop()
+
+    assert asyncio.run(scenario()) == [True, False]
+    assert sent == [("user3@example.com", "task 1")]
@@ -0,0 +1,106 @@
+# tests/test_task_search.py
+
+import asyncio
+import os
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from app.auth.principals import Principal
+from app.config.database import msg
+from app.models.roles import Role
+from app.models.status import Status
+from app.models.tasks import Task
+from app.models.users import User
+from app.modules.tasks.task_search import search_tasks
+from tests.conftest import METADATA
+from utils import encode_cursor
+
+class StatementRecorder:
+    """Stands in for the session: records the search statement and finds nothing."""
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return []
+
+def mysql_sql(statement) -> str:
+    return str(statement.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def test_search_is_scoped_ranked_and_keyset_paginated(users):
+    db = StatementRecorder()
+    status, _, data, next_cursor = asyncio.run(search_tasks(db, users[3], "invoice", 2, encode_cursor(1.5, 7)))
+
+    assert (status, data, next_cursor) == (True, [], None)
+    sql = " ".join(mysql_sql(db.statements[0]).split())
+    assert "WHERE MATCH (tasks.title, tasks.description) AGAINST ('invoice')" in sql
+    assert "tasks.user_id = 3" in sql
+    assert "AGAINST ('invoice')) < 1.5 OR (MATCH (tasks.title, tasks.description) AGAINST ('invoice')) = 1.5 AND tasks.id > 7" in sql
+    assert sql.endswith("AGAINST ('invoice') DESC, tasks.id LIMIT 3")
+
+def test_search_rejects_an_invalid_cursor(users):
+    db = StatementRecorder()
+    assert asyncio.run(search_tasks(db, users[3], "invoice", 2, "not a cursor")) == (False, msg["inv_cursor"], {}, None)
+    assert db.statements == []
+
+@pytest.mark.skipif(not os.environ.get("TEST_MYSQL_URL"), reason="TEST_MYSQL_URL not set")
+def test_search_pages_through_the_matches_on_mysql():
+    """TEST_MYSQL_URL: a mysql+pymysql:// URL of a scratch database, its tables are dropped."""
+    url = os.environ["TEST_MYSQL_URL"]
+    engine = create_engine(url)
+    for metadata in reversed(METADATA):
+        metadata.drop_all(engine)
+    for metadata in METADATA:
+        metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            Role.create_predefined_roles(session)
+            Status.create_predefined_status(session)
+        with engine.begin() as connection:
+            connection.execute(User.__table__.insert(), [
+                {"id": user_id, "email": f"user{user_id}@example.com", "name": f"user{user_id}", "role_id": role_id, "password": "x"}
+                for user_id, role_id in [(1, 1), (3, 3), (4, 3)]
+            ])
+            connection.execute(Task.__table__.insert(), [
+                {"id": task_id, "title": title, "description": description, "status_id": 2, "due_date": datetime(2024, 1, 1),
+                 "user_id": user_id, "role_id": 3, "created_by_id": 1}
+                for task_id, title, description, user_id in [
+                    (1, "invoice printer", "the invoice printer jams on every invoice", 3),
+                    (2, "send invoice", "send the march invoice", 3),
+                    (3, "invoice", "archive the invoice", 4),
+                    (4, "printer toner", "order toner", 3),
+                    (5, "invoice review", "review invoice totals", 3),
+                ]
+            ])
+
+        async def pages(principal, limit):
+            async_engine = create_async_engine(url.replace("+pymysql", "+aiomysql"))
+            try:
+                found, cursor = [], None
+                async with AsyncSession(async_engine) as db:
+                    while True:
+                        status, _, data, cursor = await search_tasks(db, principal, "invoice", limit, cursor)
+                        assert status
+                        found.extend(data)
+                        if cursor is None:
+                            return found
+            finally:
+                await async_engine.dispose()
+
+        agent = Principal(id=3, email="user3@example.com", name="user3", role_id=3)
+        found = asyncio.run(pages(agent, 1))
+        # The other agent's task 3 and the task without the term are left out
+        assert sorted(task.id for task in found) == [1, 2, 5]
+        scores = [task.score for task in found]
+        assert scores == sorted(scores, reverse=True)
+        assert found[0].id == 1
+    finally:
+        for metadata in reversed(METADATA):
+            metadata.drop_all(engine)
+        engine.dispose()
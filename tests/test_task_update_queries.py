@@ -0,0 +1,42 @@
+# tests/test_task_update_queries.py
+
+import asyncio
+from datetime import datetime
+from sqlalchemy import event, select
+from app.config import database
+from app.dto.tasks_schema import CreateHistory
+from app.models.tasks import Task, TaskDocument, TaskHistory
+from app.modules.tasks.task_services import update_task
+
+def test_update_writes_the_task_and_its_history_in_one_commit(engines, users):
+    engine, async_engine, counter = engines
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.insert(), [
+            {"id": 1, "title": "task", "status_id": 2, "due_date": datetime(2024, 1, 1), "user_id": 3, "role_id": 3, "created_by_id": 1}
+        ])
+        connection.execute(TaskDocument.__table__.insert(), [
+            {"task_id": 1, "document_path": f"static/uploads/{n}.txt"} for n in range(3)
+        ])
+    # Commits go through the DBAPI connection, not the cursor
+    event.listen(async_engine.sync_engine, "commit", lambda conn: counter.statements.append("COMMIT"))
+
+    async def update():
+        async with database.AsyncSessionLocal() as db:
+            counter.reset()
+            return await update_task(db, 1, CreateHistory(status_id=3, comments="started"), 3, users[3])
+
+    status, _, task = asyncio.run(update())
+
+    assert status
+    assert task.status_id == 3 and len(task.document_path) == 3
+    statements = [statement.lstrip().split()[0].upper() for statement in counter.statements]
+    # The task and its documents in one SELECT, the stats and list version upserts,
+    # then the UPDATE and the history INSERT flushed by the single COMMIT
+    assert len(statements) == 6
+    assert statements[0] == "SELECT"
+    assert statements[-1] == "COMMIT" and statements.count("COMMIT") == 1
+    assert "UPDATE TASKS" in counter.statements[3].upper()
+    assert "INSERT INTO TASKS_HISTORIES" in counter.statements[4].upper()
+    with engine.connect() as connection:
+        assert connection.execute(select(Task.status_id, Task.updated_by_id)).one() == (3, 3)
+        assert connection.scalars(select(TaskHistory.comments)).all() == ["started"]
@@ -1,3 +1,8 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime
 from passlib.context import CryptContext
 
 # Password hashing context
@@ -9,4 +14,31 @@ def verify_password(plain_password, hashed_password):
 
 # Function to generate hashed password
 def get_password_hash(password):
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+# Function to encode the sort key of the last row of a page into an opaque cursor
+def encode_cursor(*values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+# Function to decode a cursor produced by encode_cursor, raises ValueError when it is malformed
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+# Function to build a strong ETag from the values a response depends on
+def make_etag(*values) -> str:
+    return '"%s"' % hashlib.sha1(json.dumps(values, default=str).encode()).hexdigest()
+
+# Function to check an If-None-Match header against an ETag
+def etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}